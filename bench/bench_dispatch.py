@@ -0,0 +1,89 @@
+# compares the precompiled, table driven block and inline dispatch against the
+# old per call re.compile and if/elif chains it replaced
+#
+#   python bench/bench_dispatch.py
+import os, random, re, sys, timeit
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(bench_dir, "..", "src"))
+
+from block_markdown import (
+    block_to_html,
+    heading_tag,
+    ordered_list_item_texts,
+    markdown_to_blocks,
+    block_to_block_type,
+)
+from corpus import generate_page_markdown
+from inline_markdown import extract_markdown_images, extract_markdown_links, text_to_textnodes
+from textnode import (
+    text_node_to_html,
+    text_type_text,
+    text_type_bold,
+    text_type_italic,
+    text_type_code,
+    text_type_link,
+    text_type_img,
+)
+
+
+def old_heading_tag(block):
+    hash_pattern = re.compile(r"#*")
+    hashes = hash_pattern.match(block).group()
+    if 1 <= len(hashes) <= 6:
+        return f"h{len(hashes)}"
+    raise ValueError("invalid heading type")
+
+def old_ordered_list_item_texts(block):
+    list_items = block.split("\n")
+    ol_pattern = re.compile(r"\d+\. ")
+    return [re.sub(ol_pattern, "", list_item) for list_item in list_items]
+
+def old_extract_markdown_images(text):
+    return re.findall(r"!\[(.*?)\]\((.*?)\)", text)
+
+def old_extract_markdown_links(text):
+    return re.findall(r"\[(.*?)\]\((.*?)\)", text)
+
+def old_text_node_to_html(text_node):
+    if text_node.text_type == text_type_text:
+        return text_node.text
+    if text_node.text_type == text_type_bold:
+        return f"<b>{text_node.text}</b>"
+    if text_node.text_type == text_type_italic:
+        return f"<i>{text_node.text}</i>"
+    if text_node.text_type == text_type_code:
+        return f"<code>{text_node.text}</code>"
+    if text_node.text_type == text_type_link:
+        return f"<a href=\"{text_node.url}\">{text_node.text}</a>"
+    if text_node.text_type == text_type_img:
+        return f"<img src=\"{text_node.url}\" alt=\"{text_node.text}\"></img>"
+    raise Exception(f"{text_node.text_type} is not a valid text type")
+
+def compare(name, old, new, number):
+    assert old() == new()
+    old_time = min(timeit.repeat(old, number=number, repeat=5))
+    new_time = min(timeit.repeat(new, number=number, repeat=5))
+    print(f"{name:<24} old {old_time / number * 1e3:9.3f} ms   new {new_time / number * 1e3:9.3f} ms   {old_time / new_time:5.2f}x")
+
+
+if __name__ == "__main__":
+    rng = random.Random(42)
+    markdown = "\n\n".join(generate_page_markdown(rng, 40) for _ in range(20))
+    blocks = markdown_to_blocks(markdown)
+    headings = [f"{'#' * (i % 6 + 1)} heading {i}" for i in range(1000)]
+    ordered = "\n".join(f"{i + 1}. item {i}" for i in range(1000))
+    linky = " ".join(f"[l{i}](/l/{i}) ![i{i}](/i/{i}.png)" for i in range(1000))
+    text_nodes = [node for block in blocks if block_to_block_type(block) == "paragraph" for node in text_to_textnodes(block)]
+
+    compare("heading_tag", lambda: [old_heading_tag(h) for h in headings], lambda: [heading_tag(h) for h in headings], 50)
+    compare("ordered list items", lambda: old_ordered_list_item_texts(ordered), lambda: ordered_list_item_texts(ordered), 50)
+    compare("extract images", lambda: old_extract_markdown_images(linky), lambda: extract_markdown_images(linky), 200)
+    compare("extract links", lambda: old_extract_markdown_links(linky), lambda: extract_markdown_links(linky), 200)
+    compare(
+        "text node dispatch",
+        lambda: "".join(old_text_node_to_html(node) for node in text_nodes),
+        lambda: "".join(text_node_to_html(node) for node in text_nodes),
+        20,
+    )
+    print(f"{'blocks to html':<24} {min(timeit.repeat(lambda: [block_to_html(block) for block in blocks], number=5, repeat=5)) / 5 * 1e3:9.3f} ms for {len(blocks)} blocks")
@@ -0,0 +1,56 @@
+# compares the single pass text_to_textnodes scanner against the old
+# five pass split pipeline on link and emphasis heavy paragraphs
+#
+#   python bench/bench_inline.py
+import os, sys, timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from inline_markdown import (
+    split_nodes_delimiter,
+    split_nodes_image,
+    split_nodes_link,
+    text_to_textnodes,
+)
+from textnode import (
+    TextNode,
+    text_type_text,
+    text_type_bold,
+    text_type_italic,
+    text_type_code,
+)
+
+
+def chained_text_to_textnodes(text):
+    node = TextNode(text, text_type_text)
+    nodes = split_nodes_delimiter([node], "**", text_type_bold)
+    nodes = split_nodes_delimiter(nodes, "*", text_type_italic)
+    nodes = split_nodes_delimiter(nodes, "`", text_type_code)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+def link_heavy(n):
+    return " ".join(f"see [page {i}](/pages/{i}) and" for i in range(n))
+
+def emphasis_heavy(n):
+    return " ".join(f"**bold {i}** then *italic {i}* then `code {i}`" for i in range(n))
+
+def mixed(n):
+    return " ".join(
+        f"**b{i}** [l{i}](/l/{i}) ![i{i}](/i/{i}.png) *e{i}* `c{i}`" for i in range(n)
+    )
+
+def bench(name, text, number):
+    assert text_to_textnodes(text) == chained_text_to_textnodes(text)
+    old = min(timeit.repeat(lambda: chained_text_to_textnodes(text), number=number, repeat=3))
+    new = min(timeit.repeat(lambda: text_to_textnodes(text), number=number, repeat=3))
+    print(f"{name:<24} chained {old / number * 1e3:9.3f} ms   single pass {new / number * 1e3:9.3f} ms   {old / new:5.1f}x")
+
+
+if __name__ == "__main__":
+    for size in (10, 100, 1000, 10000):
+        number = max(1, 2000 // size)
+        bench(f"links x{size}", link_heavy(size), number)
+        bench(f"emphasis x{size}", emphasis_heavy(size), number)
+        bench(f"mixed x{size}", mixed(size), number)
@@ -0,0 +1,70 @@
+# peak memory for parsing and rendering one large synthetic document. run it
+# on two commits to compare, each run is a fresh process so RSS is comparable
+#
+#   python bench/bench_memory.py --blocks 20000
+import argparse, gc, json, os, random, resource, sys, time, tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from block_markdown import markdown_to_html_node
+from corpus import generate_page_markdown
+
+
+def count_nodes(node):
+    total = 1
+    for child in node.children or ():
+        total += count_nodes(child)
+    return total
+
+def peak_rss_mb():
+    # ru_maxrss is KB on linux and bytes on macos
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Measure peak memory of rendering a large document")
+    parser.add_argument("--blocks", type=int, default=20000, help="blocks in the document")
+    parser.add_argument("--seed", type=int, default=1234, help="corpus seed")
+    parser.add_argument("--output", type=str, default=None, help="write results JSON here")
+    args = parser.parse_args()
+
+    markdown = generate_page_markdown(random.Random(args.seed), args.blocks)
+    gc.collect()
+    rss_before = peak_rss_mb()
+
+    start = time.perf_counter()
+    tree = markdown_to_html_node(markdown)
+    html = tree.to_html()
+    elapsed = time.perf_counter() - start
+    rss_after = peak_rss_mb()
+    nodes = count_nodes(tree)
+    del tree, html
+    gc.collect()
+
+    # tracemalloc slows everything down, so it gets its own pass
+    tracemalloc.start()
+    tree = markdown_to_html_node(markdown)
+    tree_bytes, _ = tracemalloc.get_traced_memory()
+    tree.to_html()
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    results = {
+        "blocks": args.blocks,
+        "markdown_mb": len(markdown) / (1024 * 1024),
+        "nodes": nodes,
+        "seconds": elapsed,
+        "peak_rss_mb": rss_after,
+        "render_rss_growth_mb": rss_after - rss_before,
+        "tree_mb": tree_bytes / (1024 * 1024),
+        "bytes_per_node": tree_bytes / nodes,
+        "traced_peak_mb": traced_peak / (1024 * 1024),
+    }
+    for name, value in results.items():
+        print(f"{name:<24}{value:>14.2f}" if isinstance(value, float) else f"{name:<24}{value:>14}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
@@ -0,0 +1,90 @@
+# deterministic synthetic markdown for the benchmarks: the same seed always
+# gives byte-identical pages, so timings from different commits compare
+import os, random
+
+words = (
+    "the quick brown fox jumps over lazy dog ring hobbit wizard mountain river "
+    "elf dwarf shire road forest tower sword shadow light journey fellowship"
+).split()
+
+
+def sentence(rng, n_words):
+    return " ".join(rng.choice(words) for _ in range(n_words))
+
+def linked_paragraph(rng, n_links=20):
+    parts = []
+    for i in range(n_links):
+        parts.append(sentence(rng, rng.randint(3, 8)))
+        kind = rng.random()
+        if kind < 0.6:
+            parts.append(f"[{sentence(rng, 2)}](/pages/{rng.randint(0, 9999)})")
+        elif kind < 0.8:
+            parts.append(f"**{sentence(rng, 2)}**")
+        elif kind < 0.9:
+            parts.append(f"*{sentence(rng, 2)}*")
+        else:
+            parts.append(f"`{rng.choice(words)}()`")
+    return " ".join(parts) + "."
+
+def long_list(rng, n_items=50, ordered=False):
+    items = []
+    for i in range(n_items):
+        marker = f"{i + 1}." if ordered else rng.choice(("*", "-"))
+        items.append(f"{marker} {sentence(rng, rng.randint(4, 10))} [ref](/ref/{i})")
+    return "\n".join(items)
+
+def code_fence(rng, n_lines=80):
+    # code text still goes through inline parsing, so keep it delimiter free.
+    # a blank line every 10 lines keeps the scanner's in-fence path busy
+    lines = ["```"]
+    for i in range(n_lines):
+        lines.append(f"    {rng.choice(words)}_{i} = {rng.choice(words)}({rng.randint(0, 100)})")
+        if i % 10 == 9:
+            lines.append("")
+    lines.append("```")
+    return "\n".join(lines)
+
+def image_gallery(rng, n_images=20):
+    return " ".join(
+        f"![{sentence(rng, 3)}](/images/{rng.choice(words)}_{i}.png)" for i in range(n_images)
+    )
+
+def quote(rng, n_lines=6):
+    return "\n".join(f"> {sentence(rng, rng.randint(5, 12))}" for _ in range(n_lines))
+
+def heading(rng):
+    return f"{'#' * rng.randint(2, 4)} {sentence(rng, 4)}"
+
+block_makers = (
+    (linked_paragraph, 0.35),
+    (long_list, 0.15),
+    (lambda rng: long_list(rng, ordered=True), 0.1),
+    (code_fence, 0.1),
+    (image_gallery, 0.1),
+    (quote, 0.1),
+    (heading, 0.1),
+)
+
+def generate_page_markdown(rng, n_blocks):
+    makers = [maker for maker, _ in block_makers]
+    weights = [weight for _, weight in block_makers]
+    blocks = [f"# {sentence(rng, 5)}"]
+    for maker in rng.choices(makers, weights, k=n_blocks):
+        blocks.append(maker(rng))
+    return "\n\n".join(blocks) + "\n"
+
+def generate_corpus(n_pages=20, n_blocks=1000, seed=1234):
+    # returns {relative dir: markdown}
+    rng = random.Random(seed)
+    pages = {}
+    for i in range(n_pages):
+        rel_dir = "" if i == 0 else os.path.join(f"section{i % 5}", f"page{i}")
+        pages[rel_dir] = generate_page_markdown(rng, n_blocks)
+    return pages
+
+def write_corpus(content_dir, n_pages=20, n_blocks=1000, seed=1234):
+    for rel_dir, markdown in generate_corpus(n_pages, n_blocks, seed).items():
+        page_dir = os.path.join(content_dir, rel_dir)
+        os.makedirs(page_dir, exist_ok=True)
+        with open(os.path.join(page_dir, "index.md"), "w") as f:
+            f.write(markdown)
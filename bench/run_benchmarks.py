@@ -0,0 +1,186 @@
+# times the hot paths of the generator against a synthetic corpus and saves
+# the results as JSON, so runs from different commits can be compared
+#
+#   python bench/run_benchmarks.py --output before.json
+#   python bench/run_benchmarks.py --compare before.json
+import argparse, json, os, platform, shutil, subprocess, sys, tempfile, time
+
+bench_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(bench_dir, "..", "src"))
+
+from block_markdown import (
+    markdown_to_blocks,
+    markdown_to_html_node,
+    iter_lines,
+    scan_blocks,
+    paragraph_text,
+    heading_text,
+    code_text,
+    quote_text,
+    unordered_list_item_texts,
+    ordered_list_item_texts,
+    block_type_heading,
+    block_type_code,
+    block_type_quote,
+    block_type_unordered_list,
+    block_type_ordered_list,
+)
+from build import build_site
+import console
+from corpus import generate_page_markdown, write_corpus
+from gencontent import generate_pages_recursive
+from inline_markdown import text_to_textnodes
+import random
+
+template = """<!DOCTYPE html>
+<html>
+<head><title>{{ Title }}</title></head>
+<body><article>{{ Content }}</article></body>
+</html>
+"""
+
+
+def best_of(function, repeat):
+    # best of n runs is the least noisy number on a busy machine
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+# block type -> the block_markdown helper pulling its inline text(s) out,
+# the same ones the block_to_* functions use
+inline_text_extractors = {
+    block_type_heading: lambda block: [heading_text(block)],
+    block_type_code: lambda block: [code_text(block)],
+    block_type_quote: lambda block: [quote_text(block)],
+    block_type_unordered_list: unordered_list_item_texts,
+    block_type_ordered_list: ordered_list_item_texts,
+}
+
+def inline_texts(blocks):
+    # the strings the block_to_* functions hand to text_to_textnodes, for
+    # Blocks from scan_blocks
+    texts = []
+    for block in blocks:
+        extract = inline_text_extractors.get(block.block_type, lambda text: [paragraph_text(text)])
+        texts.extend(extract(block.text))
+    return texts
+
+def bench_page(n_blocks, repeat, seed):
+    markdown = generate_page_markdown(random.Random(seed), n_blocks)
+    texts = inline_texts(scan_blocks(iter_lines(markdown)))
+    tree = markdown_to_html_node(markdown)
+
+    def inline_all():
+        for text in texts:
+            text_to_textnodes(text)
+
+    return {
+        "markdown_to_blocks": best_of(lambda: markdown_to_blocks(markdown), repeat),
+        "text_to_textnodes": best_of(inline_all, repeat),
+        "markdown_to_html_node": best_of(lambda: markdown_to_html_node(markdown), repeat),
+        "to_html": best_of(tree.to_html, repeat),
+    }
+
+def bench_site(n_pages, n_blocks, repeat, seed):
+    results = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        content = os.path.join(tmp, "content")
+        static = os.path.join(tmp, "static")
+        public = os.path.join(tmp, "public")
+        template_path = os.path.join(tmp, "template.html")
+        manifest = os.path.join(tmp, "manifest.json")
+        write_corpus(content, n_pages, n_blocks, seed)
+        os.makedirs(static)
+        with open(template_path, "w") as f:
+            f.write(template)
+
+        def recursive_build():
+            if os.path.exists(public):
+                shutil.rmtree(public)
+            os.makedirs(public)
+            generate_pages_recursive(content, template_path, public)
+
+        def full_build():
+            build_site(content, template_path, static, public, manifest, clean=True)
+
+        def warm_build():
+            build_site(content, template_path, static, public, manifest, incremental=True)
+
+        results["generate_pages_recursive"] = best_of(recursive_build, repeat)
+        results["build_site_full"] = best_of(full_build, repeat)
+        results["build_site_warm"] = best_of(warm_build, repeat)
+    return results
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, cwd=bench_dir, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline, threshold):
+    # returns the names of benchmarks that got slower by more than threshold
+    regressions = []
+    print(f"{'benchmark':<28}{'baseline ms':>14}{'current ms':>14}{'change':>10}")
+    for name, seconds in results["timings"].items():
+        before = baseline["timings"].get(name)
+        if before is None:
+            print(f"{name:<28}{'-':>14}{seconds * 1000:>14.2f}{'new':>10}")
+            continue
+        change = (seconds - before) / before
+        flag = "  <-- regression" if change > threshold else ""
+        print(f"{name:<28}{before * 1000:>14.2f}{seconds * 1000:>14.2f}{change:>+10.1%}{flag}")
+        if change > threshold:
+            regressions.append(name)
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the static site generator hot paths")
+    parser.add_argument("--pages", type=int, default=20, help="pages in the synthetic site")
+    parser.add_argument("--blocks", type=int, default=1000, help="blocks per page")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per benchmark, best is kept")
+    parser.add_argument("--seed", type=int, default=1234, help="corpus seed")
+    parser.add_argument("--output", type=str, default=None, help="write results JSON here")
+    parser.add_argument("--compare", type=str, default=None, help="baseline results JSON to compare against")
+    parser.add_argument(
+        "--threshold", type=float, default=0.10,
+        help="slowdown (fraction) that counts as a regression when comparing",
+    )
+    args = parser.parse_args()
+    # only the timings, not the builds' summary lines
+    console.set_level(console.quiet)
+
+    timings = bench_page(args.blocks, args.repeat, args.seed)
+    timings.update(bench_site(args.pages, args.blocks, args.repeat, args.seed))
+    results = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "pages": args.pages,
+            "blocks": args.blocks,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "timings": timings,
+    }
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        if baseline.get("config") != results["config"]:
+            print("warning: baseline was run with a different config, numbers won't line up")
+        if compare(results, baseline, args.threshold):
+            sys.exit(1)
+    else:
+        for name, seconds in timings.items():
+            print(f"{name:<28}{seconds * 1000:>12.2f} ms")
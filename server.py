@@ -1,6 +1,10 @@
 import os
 import argparse
-from http.server import HTTPServer, SimpleHTTPRequestHandler
+import threading
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from http import HTTPStatus
+from http.server import HTTPServer, ThreadingHTTPServer, SimpleHTTPRequestHandler
 
 
 class CORSHTTPRequestHandler(SimpleHTTPRequestHandler):
@@ -15,9 +19,149 @@ class CORSHTTPRequestHandler(SimpleHTTPRequestHandler):
         self.end_headers()
 
 
+class FileCache:
+    # LRU of file bytes, bounded by total size. entries are keyed by path and
+    # only reused while the file's mtime and size still match
+    def __init__(self, max_bytes=64 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, path, stat):
+        signature = (stat.st_mtime_ns, stat.st_size)
+        with self.lock:
+            entry = self.entries.get(path)
+            if entry is not None and entry[0] == signature:
+                self.entries.move_to_end(path)
+                return entry[1]
+
+        with open(path, "rb") as f:
+            data = f.read()
+
+        # files bigger than the whole cache are served but never kept
+        if len(data) > self.max_bytes:
+            return data
+        with self.lock:
+            old = self.entries.pop(path, None)
+            if old is not None:
+                self.total_bytes -= len(old[1])
+            self.entries[path] = (signature, data)
+            self.total_bytes += len(data)
+            while self.total_bytes > self.max_bytes:
+                _, (_, evicted) = self.entries.popitem(last=False)
+                self.total_bytes -= len(evicted)
+        return data
+
+
+class CachingHTTPRequestHandler(CORSHTTPRequestHandler):
+    # serves files out of a shared in-memory cache, picks precompressed .br/.gz
+    # siblings when the client accepts them and answers conditional requests
+    # with 304s. directory listings and redirects go through the stock handler
+    file_cache = FileCache()
+
+    # sibling suffix -> Content-Encoding, in order of preference
+    precompressed = (
+        (".br", "br"),
+        (".gz", "gzip"),
+    )
+
+    def do_GET(self):
+        self.serve_file(send_body=True)
+
+    def do_HEAD(self):
+        self.serve_file(send_body=False)
+
+    def serve_file(self, send_body):
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            index = os.path.join(path, "index.html")
+            if not self.path.split("?", 1)[0].endswith("/") or not os.path.isfile(index):
+                return super().do_GET() if send_body else super().do_HEAD()
+            path = index
+        try:
+            stat = os.stat(path)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        serve_path, serve_stat, encoding = self.choose_encoding(path, stat)
+        etag = f'"{serve_stat.st_mtime_ns:x}-{serve_stat.st_size:x}{"-" + encoding if encoding else ""}"'
+        if self.not_modified(etag, stat):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self.send_header("ETag", etag)
+            self.send_header("Vary", "Accept-Encoding")
+            self.end_headers()
+            return
+
+        try:
+            data = self.file_cache.get(serve_path, serve_stat)
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", self.guess_type(path))
+        self.send_header("Content-Length", str(len(data)))
+        self.send_header("Last-Modified", formatdate(stat.st_mtime, usegmt=True))
+        self.send_header("ETag", etag)
+        self.send_header("Vary", "Accept-Encoding")
+        if encoding:
+            self.send_header("Content-Encoding", encoding)
+        self.end_headers()
+        if send_body:
+            self.wfile.write(data)
+
+    def choose_encoding(self, path, stat):
+        accepted = self.accepted_encodings()
+        for suffix, encoding in self.precompressed:
+            if encoding not in accepted:
+                continue
+            try:
+                sibling_stat = os.stat(path + suffix)
+            except OSError:
+                continue
+            # a sibling older than the file it compresses is stale, skip it
+            if sibling_stat.st_mtime_ns >= stat.st_mtime_ns:
+                return path + suffix, sibling_stat, encoding
+        return path, stat, None
+
+    def accepted_encodings(self):
+        accepted = set()
+        for part in self.headers.get("Accept-Encoding", "").split(","):
+            name, _, params = part.partition(";")
+            quality = 1.0
+            for param in params.split(";"):
+                key, _, value = param.strip().partition("=")
+                if key == "q":
+                    try:
+                        quality = float(value)
+                    except ValueError:
+                        quality = 0.0
+            if name.strip() and quality > 0:
+                accepted.add(name.strip().lower())
+        return accepted
+
+    def not_modified(self, etag, stat):
+        if_none_match = self.headers.get("If-None-Match")
+        if if_none_match is not None:
+            tags = [tag.strip() for tag in if_none_match.split(",")]
+            return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+        if_modified_since = self.headers.get("If-Modified-Since")
+        if if_modified_since is not None:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            # http dates only have second precision
+            return int(stat.st_mtime) <= since.timestamp()
+        return False
+
+
 def run(
-    server_class=HTTPServer,
-    handler_class=CORSHTTPRequestHandler,
+    server_class=ThreadingHTTPServer,
+    handler_class=CachingHTTPRequestHandler,
     port=8000,
     directory=None,
 ):
@@ -35,6 +179,26 @@ if __name__ == "__main__":
         "--dir", type=str, help="Directory to serve files from", default="."
     )
     parser.add_argument("--port", type=int, help="Port to serve HTTP on", default=8888)
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        help="Size of the in-memory file cache in MB",
+        default=64,
+    )
+    parser.add_argument(
+        "--single-threaded",
+        action="store_true",
+        help="Handle one request at a time with the plain uncached handler",
+    )
     args = parser.parse_args()
 
-    run(port=args.port, directory=args.dir)
+    if args.single_threaded:
+        run(
+            server_class=HTTPServer,
+            handler_class=CORSHTTPRequestHandler,
+            port=args.port,
+            directory=args.dir,
+        )
+    else:
+        CachingHTTPRequestHandler.file_cache = FileCache(args.cache_mb * 1024 * 1024)
+        run(port=args.port, directory=args.dir)
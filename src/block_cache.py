@@ -0,0 +1,104 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+default_block_cache_size = 10000
+default_block_cache_path = ".ssg-cache/blocks.json"
+
+# the modules whose code decides what a block renders to, if any of them
+# change every cached fragment is suspect
+renderer_modules = (
+    "block_markdown.py",
+    "document.py",
+    "inline_markdown.py",
+    "textnode.py",
+    "htmlnode.py",
+)
+
+
+def renderer_version(modules=renderer_modules):
+    digest = hashlib.sha256()
+    src_dir = os.path.dirname(os.path.abspath(__file__))
+    for module in modules:
+        with open(os.path.join(src_dir, module), "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+def block_key(block):
+    return hashlib.blake2b(block.encode(), digest_size=16).hexdigest()
+
+
+class BlockCache:
+    # bounded LRU of raw markdown block -> rendered html fragment (plus the
+    # block's Document metadata, see render_block), so blocks
+    # repeated across pages (and builds, when persisted) skip parsing entirely
+    def __init__(self, max_entries=default_block_cache_size):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        # in a pool worker, what it rendered since the last take_added(), so
+        # the parent's cache can learn it too. None elsewhere
+        self.added = None
+
+    def get(self, block):
+        key = block_key(block)
+        html = self.entries.get(key)
+        if html is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return html
+
+    def put(self, block, html):
+        key = block_key(block)
+        self.entries[key] = html
+        self.entries.move_to_end(key)
+        if self.added is not None:
+            self.added.append((key, html))
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def take_added(self):
+        added, self.added = self.added, []
+        return added
+
+    def add_entries(self, entries):
+        # (key, html) pairs from a worker's take_added()
+        for key, html in entries:
+            self.entries[key] = html
+            self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __repr__(self):
+        return f"BlockCache({len(self.entries)}/{self.max_entries} entries, {self.hits} hits, {self.misses} misses)"
+
+    def save(self, path):
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {"version": renderer_version(), "entries": list(self.entries.items())},
+                f,
+            )
+        os.replace(tmp_path, path)
+
+    def load(self, path):
+        # a missing, unreadable or out of date cache file just means a cold cache
+        try:
+            with open(path) as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return
+        if saved.get("version") != renderer_version():
+            return
+        for key, html in saved["entries"][-self.max_entries:]:
+            self.entries[key] = html
@@ -1,5 +1,6 @@
 from htmlnode import HTMLNode, LeafNode, ParentNode
-from textnode import text_node_to_html_node
+from document import Document, document_from_metadata
+from textnode import text_node_to_html_node, text_node_to_html
 from inline_markdown import *
 import re
 
@@ -10,22 +11,140 @@ block_type_quote = "quote"
 block_type_unordered_list = "unordered_list"
 block_type_ordered_list = "ordered_list"
 
+# compiled once here rather than on every block
+heading_hash_pattern = re.compile(r"#*")
+ordered_list_item_pattern = re.compile(r"\d+\. ")
+
+
+class Block:
+    # a block from scan_blocks: its text (stripped, like markdown_to_blocks
+    # gives), its type, and where it starts in the source (1-based line number
+    # and character offset)
+    __slots__ = ("text", "block_type", "line", "offset")
+
+    def __init__(self, text, block_type, line=1, offset=0):
+        self.text = text
+        self.block_type = block_type
+        self.line = line
+        self.offset = offset
+
+    def __eq__(self, other):
+        return (
+            self.text == other.text
+            and self.block_type == other.block_type
+            and self.line == other.line
+            and self.offset == other.offset
+        )
+
+    def __repr__(self):
+        return f"Block({self.text!r}, {self.block_type}, line {self.line}, offset {self.offset})"
+
+
+def iter_lines(markdown):
+    # like markdown.splitlines(keepends=True) but only splits on \n, the
+    # same as the old split("\n\n") did (\r\n still works, the \r stays on the line)
+    start = 0
+    end = markdown.find("\n")
+    while end != -1:
+        yield markdown[start:end + 1]
+        start = end + 1
+        end = markdown.find("\n", start)
+    if start < len(markdown):
+        yield markdown[start:]
+
+def is_fence_opener(line):
+    # ``` plus an optional info string, which can't contain backticks
+    # (so "```inline code``` at the start of a paragraph" isn't a fence)
+    return line.startswith("```") and "`" not in line[3:]
+
+def scan_blocks(lines, first_line=1, first_offset=0, fences=True):
+    # single pass line scanner: lines can be any iterable of lines (with or
+    # without their line endings), e.g. an open file, so a big document never
+    # has to be in memory as a whole. blocks are separated by blank lines,
+    # except inside ``` fences, and each one is classified as it's collected
+    # instead of re-scanning it afterwards
+    current = [] # lines of the block being collected
+    raw_fence = [] # raw lines of an open fence, in case it never closes
+    in_fence = False
+    ordered = True
+    start_line = start_offset = fence_offset = 0
+    line_number = first_line - 1
+    offset = first_offset
+    for raw_line in lines:
+        line_number += 1
+        line_offset = offset
+        offset += len(raw_line)
+        line = raw_line.rstrip("\r\n")
+
+        if in_fence:
+            current.append(line)
+            raw_fence.append(raw_line)
+            if line.rstrip().endswith("```"):
+                # closed, the block carries on until the next blank line like
+                # any other (and ends up a paragraph if more text follows)
+                in_fence = False
+            continue
+
+        if line.strip() == "":
+            if current:
+                yield finish_block(current, None, start_line, start_offset, ordered)
+                current = []
+            continue
+
+        if not current:
+            stripped = line.lstrip()
+            start_line = line_number
+            start_offset = line_offset + len(line) - len(stripped)
+            line = stripped
+            ordered = True
+            if fences and is_fence_opener(line):
+                in_fence = True
+                raw_fence = [raw_line]
+                fence_offset = line_offset
+                ordered = False
+                current.append(line)
+                continue
+
+        if ordered and not line.startswith(f"{len(current) + 1}. "):
+            ordered = False
+        current.append(line)
+
+    if in_fence:
+        # never closed, so it's not a fence after all, split it up normally
+        yield from scan_blocks(raw_fence, start_line, fence_offset, fences=False)
+    elif current:
+        yield finish_block(current, None, start_line, start_offset, ordered)
+
+def finish_block(lines, block_type, line, offset, ordered=False):
+    lines[-1] = lines[-1].rstrip()
+    # the scanner saw the last line before it was stripped, "2. " is an item
+    # but "2." isn't
+    if ordered and not lines[-1].startswith(f"{len(lines)}. "):
+        ordered = False
+    text = "\n".join(lines)
+    if block_type is None:
+        first = lines[0]
+        if first.startswith("#"):
+            block_type = block_type_heading
+        elif first.startswith("```") and text.endswith("```"):
+            block_type = block_type_code
+        elif first.startswith(">"):
+            block_type = block_type_quote
+        elif first.startswith(("- ", "* ")):
+            block_type = block_type_unordered_list
+        elif ordered:
+            block_type = block_type_ordered_list
+        else:
+            block_type = match_extra_block_type(text)
+    return Block(text, block_type, line, offset)
 
 def markdown_to_blocks(markdown):
     # # fp implementation
     # blocks = list(filter(lambda b: b != "", map(lambda b: b.strip(), markdown.split("\n\n"))))
     # return blocks
 
-    # procedural implementation
-    blocks = markdown.split("\n\n")
-    filtered_blocks = []
-    for block in blocks:
-        if block == "":
-            continue
-        block = block.strip()
-        filtered_blocks.append(block)
-
-    return filtered_blocks
+    # line scanner implementation, see scan_blocks
+    return [block.text for block in scan_blocks(iter_lines(markdown))]
 
 def block_to_block_type(block):
     if block.startswith("#"):
@@ -39,7 +158,15 @@ def block_to_block_type(block):
     elif is_ordered_list(block):
         return block_type_ordered_list
     else:
-        return block_type_paragraph
+        return match_extra_block_type(block)
+
+def match_extra_block_type(block):
+    # registered block types get a look at anything the built in ones didn't
+    # claim, before it falls through to a paragraph
+    for block_type, matches in extra_block_types:
+        if matches(block):
+            return block_type
+    return block_type_paragraph
 
 def is_ordered_list(block):
     items = block.split("\n")
@@ -51,111 +178,101 @@ def is_ordered_list(block):
         i += 1
     return True
 
-def block_to_paragraph(block):
+# each block type is split in two: pulling the inline text(s) out of the raw
+# block, then either building nodes from it (block_to_*) or writing html for it
+# directly (block_to_*_html). both paths share the first half so they can't
+# drift apart
+
+def paragraph_text(block):
     lines = block.split("\n")
-    text = " ".join(lines)
+    return " ".join(lines)
 
+def heading_tag(block):
+    # need to consider number of #'s for heading type (h1, h2, h3, etc)
+    hashes = heading_hash_pattern.match(block).group()
+    if 1 <= len(hashes) <= 6:
+        return f"h{len(hashes)}"
+    raise ValueError("invalid heading type")
+
+def heading_text(block):
+    return block.lstrip("# ") # remove leading #'s
+
+def code_text(block):
+    # assuming a code block can have inline children, seems weird though
+    code_lines = block.strip("`").split("\n")
+    return " ".join(code_lines)
+
+def quote_text(block):
+    # each line is prepended with a "> ", need to handle this
+    quote_lines = block.split("\n")
+
+    stripped_lines = []
+    for quote_line in quote_lines:
+        no_arrow_line = quote_line.lstrip("> ")
+        stripped_lines.append(no_arrow_line)
+    return " ".join(stripped_lines)
+
+def unordered_list_item_texts(block):
+    list_items = block.split("\n")
+    return [list_item[1:].lstrip(" ") for list_item in list_items]
+
+def ordered_list_item_texts(block):
+    list_items = block.split("\n")
+    return [ordered_list_item_pattern.sub("", list_item) for list_item in list_items]
+
+def text_to_children(text):
     child_nodes = []
     text_nodes = text_to_textnodes(text)
     for text_node in text_nodes:
         html_node = text_node_to_html_node(text_node)
         child_nodes.append(html_node)
+    return child_nodes
+
+def text_to_html(text, document=None):
+    # document, when given, collects word counts and links from the same nodes
+    text_nodes = text_to_textnodes(text)
+    if document is not None:
+        document.add_text_nodes(text_nodes)
+    return "".join(text_node_to_html(text_node) for text_node in text_nodes)
+
+def block_to_paragraph(block):
     return ParentNode(
         "p",
-        child_nodes
+        text_to_children(paragraph_text(block))
     )
 
 def block_to_heading(block):
-    # need to consider number of #'s for heading type (h1, h2, h3, etc)
-    hash_pattern = re.compile(r"#*")
-    hashes = hash_pattern.match(block).group()
-    tag = ""
-    if len(hashes) == 1:
-        tag = "h1"
-    elif len(hashes) == 2:
-        tag = "h2"
-    elif len(hashes) == 3:
-        tag = "h3"
-    elif len(hashes) == 4:
-        tag = "h4"
-    elif len(hashes) == 5:
-        tag = "h5"
-    elif len(hashes) == 6:
-        tag = "h6"
-    else:
-        raise ValueError("invalid heading type")
-
-    child_nodes = []
-    text_nodes = text_to_textnodes(block.lstrip("# ")) # remove leading #'s, do this in other function?
-    for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
-        child_nodes.append(html_node)
-
     return ParentNode(
-        tag,
-        child_nodes
+        heading_tag(block),
+        text_to_children(heading_text(block))
     )
 
 def block_to_code(block):
     # return a <pre> ParentNode, and it only has one child node
     # namely, the <code> node (which is a ParentNode itself)
-    # assuming a code block node can have inline children, seems weird though
-    child_nodes = []
-    code_lines = block.strip("`").split("\n")
-    code_text = " ".join(code_lines)
-    text_nodes = text_to_textnodes(code_text)
-    for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
-        child_nodes.append(html_node)
     code_block_node = ParentNode(
         "code",
-        child_nodes
+        text_to_children(code_text(block))
     )
     return ParentNode(
         "pre",
         [code_block_node]
     )
 
-
 def block_to_quote(block):
-    # seems pretty simple, just needs child inline nodes and <blockquote> tag
-    # each line is prepended with a "> ", need to handle this
-    quote_lines = block.split("\n")
-
-    stripped_lines = []
-    for quote_line in quote_lines:
-        no_arrow_line = quote_line.lstrip("> ")
-        stripped_lines.append(no_arrow_line)
-    no_arrows_quote  = " ".join(stripped_lines)
-
-    text_nodes = text_to_textnodes(no_arrows_quote)
-    child_nodes = []
-    for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
-        child_nodes.append(html_node)
-
     return ParentNode(
         "blockquote",
-        child_nodes
+        text_to_children(quote_text(block))
     )
 
 def block_to_unordered_list(block):
     # need to handle child nodes by giving them <li> tags
-    # maybe similar logic to code block funciton
-    list_items = block.split("\n")
-
     child_nodes = []
-    for list_item in list_items:
-        text_nodes = text_to_textnodes(list_item[1:].lstrip(" "))
-
-        list_item_nodes = []
-        for text_node in text_nodes:
-            html_node = text_node_to_html_node(text_node)
-            list_item_nodes.append(html_node)
+    for item_text in unordered_list_item_texts(block):
         child_nodes.append(
             ParentNode(
                 "li",
-                list_item_nodes
+                text_to_children(item_text)
             )
         )
     return ParentNode(
@@ -165,21 +282,12 @@ def block_to_unordered_list(block):
 
 def block_to_ordered_list(block):
     # virtually identical to unordered list function?
-    list_items = block.split("\n")
-    ol_pattern = re.compile(r"\d+\. ")
-
     child_nodes = []
-    for list_item in list_items:
-        text_nodes = text_to_textnodes(re.sub(ol_pattern, "", list_item))
-
-        list_item_nodes = []
-        for text_node in text_nodes:
-            html_node = text_node_to_html_node(text_node)
-            list_item_nodes.append(html_node)
+    for item_text in ordered_list_item_texts(block):
         child_nodes.append(
             ParentNode(
                 "li",
-                list_item_nodes
+                text_to_children(item_text)
             )
         )
     return ParentNode(
@@ -187,30 +295,136 @@ def block_to_ordered_list(block):
         child_nodes
     )
 
-def markdown_to_html_node(markdown):
-    child_blocks = markdown_to_blocks(markdown)
+def block_to_paragraph_html(block, document=None):
+    return f"<p>{text_to_html(paragraph_text(block), document)}</p>"
+
+def block_to_heading_html(block, document=None):
+    tag = heading_tag(block)
+    if document is not None:
+        document.add_heading(int(tag[1]), heading_text(block))
+    return f"<{tag}>{text_to_html(heading_text(block), document)}</{tag}>"
+
+def block_to_code_html(block, document=None):
+    return f"<pre><code>{text_to_html(code_text(block), document)}</code></pre>"
+
+def block_to_quote_html(block, document=None):
+    return f"<blockquote>{text_to_html(quote_text(block), document)}</blockquote>"
+
+def block_to_unordered_list_html(block, document=None):
+    items = "".join(f"<li>{text_to_html(item_text, document)}</li>" for item_text in unordered_list_item_texts(block))
+    return f"<ul>{items}</ul>"
 
+def block_to_ordered_list_html(block, document=None):
+    items = "".join(f"<li>{text_to_html(item_text, document)}</li>" for item_text in ordered_list_item_texts(block))
+    return f"<ol>{items}</ol>"
+
+def markdown_to_html_node(markdown, block_cache=None):
     # need to handle stripping the relevant leading and trailing characters
     # either here or block_to_xxx functions
     child_nodes = []
-    for child_block in child_blocks:
-        block_type = block_to_block_type(child_block)
-        if block_type == block_type_paragraph:
-            child_nodes.append(block_to_paragraph(child_block))
-        elif block_type == block_type_heading:
-            child_nodes.append(block_to_heading(child_block))
-        elif block_type == block_type_quote:
-            child_nodes.append(block_to_quote(child_block))
-        elif block_type == block_type_code:
-            child_nodes.append(block_to_code(child_block))
-        elif block_type == block_type_unordered_list:
-            child_nodes.append(block_to_unordered_list(child_block))
-        elif block_type == block_type_ordered_list:
-            child_nodes.append(block_to_ordered_list(child_block))
+    for block in scan_blocks(iter_lines(markdown)):
+        if block_cache is not None:
+            # with a cache each block becomes a raw html leaf, rendered once
+            # and reused whenever the same block text shows up again
+            child_nodes.append(LeafNode(None, render_block(block, block_cache)))
         else:
-            raise ValueError(f"{block_type} is not a valid block type")
+            child_nodes.append(block_to_html_node(block.text, block.block_type))
 
     return ParentNode(
         "div",
         child_nodes
     )
+
+# block type -> function building an HTMLNode / function returning the html
+# string, see register_block_type. dispatch is a dict lookup instead of an
+# if/elif chain
+block_node_builders = {
+    block_type_paragraph: block_to_paragraph,
+    block_type_heading: block_to_heading,
+    block_type_quote: block_to_quote,
+    block_type_code: block_to_code,
+    block_type_unordered_list: block_to_unordered_list,
+    block_type_ordered_list: block_to_ordered_list,
+}
+block_html_builders = {
+    block_type_paragraph: block_to_paragraph_html,
+    block_type_heading: block_to_heading_html,
+    block_type_quote: block_to_quote_html,
+    block_type_code: block_to_code_html,
+    block_type_unordered_list: block_to_unordered_list_html,
+    block_type_ordered_list: block_to_ordered_list_html,
+}
+
+# (block type, matches(block)) for registered types that need classifying
+extra_block_types = []
+
+def register_block_type(block_type, to_html_node, to_html=None, matches=None):
+    # plugs a new block type (or a replacement renderer for an existing one)
+    # into both render paths. to_html(block, document=None) defaults to
+    # to_html_node(block).to_html(), it can add to document's metadata.
+    # matches(block) -> bool lets blocks that would otherwise be paragraphs be
+    # classified as this type
+    if to_html is None:
+        to_html = lambda block, document=None: to_html_node(block).to_html()
+    block_node_builders[block_type] = to_html_node
+    block_html_builders[block_type] = to_html
+    if matches is not None:
+        extra_block_types[:] = [entry for entry in extra_block_types if entry[0] != block_type]
+        extra_block_types.append((block_type, matches))
+
+def block_to_html_node(block, block_type=None):
+    # block_type can be passed in when it's already known, e.g. from scan_blocks
+    if block_type is None:
+        block_type = block_to_block_type(block)
+    builder = block_node_builders.get(block_type)
+    if builder is None:
+        raise ValueError(f"{block_type} is not a valid block type")
+    return builder(block)
+
+def block_to_html(block, block_type=None, document=None):
+    # same as block_to_html_node(block).to_html(), minus building the nodes
+    if block_type is None:
+        block_type = block_to_block_type(block)
+    builder = block_html_builders.get(block_type)
+    if builder is None:
+        raise ValueError(f"{block_type} is not a valid block type")
+    return builder(block, document)
+
+def render_block(block, block_cache=None, document=None):
+    # html for a scanned Block. cache entries keep the block's metadata next
+    # to its html so a hit still fills in the document
+    if block_cache is None:
+        return block_to_html(block.text, block.block_type, document)
+    cached = block_cache.get(block.text)
+    if cached is None:
+        part = Document()
+        cached = (block_to_html(block.text, block.block_type, part), part.metadata())
+        block_cache.put(block.text, cached)
+    html, metadata = cached
+    if document is not None:
+        document.merge(document_from_metadata(metadata))
+    return html
+
+def iter_markdown_html(markdown, block_cache=None):
+    # the fast render path: yields the same html markdown_to_html_node(...).to_html()
+    # would produce, one block at a time, without building an HTMLNode tree.
+    # use markdown_to_html_node when you need to inspect or transform the tree
+    return iter_blocks_html(scan_blocks(iter_lines(markdown)), block_cache)
+
+def iter_blocks_html(blocks, block_cache=None, document=None):
+    # blocks is an iterable of Blocks, e.g. scan_blocks over an open file
+    yield "<div>"
+    for block in blocks:
+        yield render_block(block, block_cache, document)
+    yield "</div>"
+
+def markdown_to_html(markdown, block_cache=None):
+    return "".join(iter_markdown_html(markdown, block_cache))
+
+def markdown_to_document(markdown, block_cache=None):
+    # renders the page body and collects its title, outline, word count and
+    # links in the same pass
+    document = Document()
+    blocks = scan_blocks(iter_lines(markdown))
+    document.html = "".join(iter_blocks_html(blocks, block_cache, document))
+    return document
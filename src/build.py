@@ -0,0 +1,291 @@
+from block_cache import renderer_version
+from compress import compress_site, remove_orphans
+from copystatic import sync_static, default_static_ignore
+from depgraph import TemplateChooser, Fingerprints, static_sources, page_dependencies, rebuild_reason
+from frontmatter import read_front_matter
+from gencontent import generate_pages, discover_pages
+from images import process_images, image_index, changed_image_urls, default_image_widths
+from inventory import Inventory
+from linkcheck import check_links, write_link_report
+from listings import write_listings, default_feed_size
+from profiler import profile_stage
+from manifest import empty_manifest, load_manifest, save_manifest, hash_file
+from page_cache import page_renderer_modules
+from template import load_template
+import console, os, shutil, time
+
+# mtimes this close to the last build's start aren't trusted, see stat_unchanged
+racy_window_ns = 1_000_000_000
+
+
+def build_site(
+    content_dir,
+    template_path,
+    static_dir,
+    dest_dir,
+    manifest_path,
+    incremental=False,
+    jobs=1,
+    clean=False,
+    static_ignore=default_static_ignore,
+    link_mode="copy",
+    block_cache=None,
+    page_cache=None,
+    link_report=None,
+    compress=False,
+    images=False,
+    image_widths=default_image_widths,
+    site_url=None,
+    feed_size=default_feed_size,
+    section_indexes=False,
+    feed_author=None,
+):
+    # a clean build wipes public/ and starts from an empty manifest. otherwise
+    # the manifest from the last run tells us which outputs are ours to remove,
+    # and an incremental build also uses it to skip unchanged pages
+    if clean:
+        old_manifest = empty_manifest()
+        if os.path.exists(dest_dir):
+            shutil.rmtree(dest_dir)
+    else:
+        old_manifest = load_manifest(manifest_path)
+    os.makedirs(dest_dir, exist_ok=True)
+
+    new_manifest = empty_manifest()
+    new_manifest["started_ns"] = time.time_ns()
+
+    # one scandir walk of content/ and static/, everything after this takes
+    # its file list and stats from the inventory instead of the disk
+    with profile_stage("walk"):
+        inventory = Inventory([content_dir, static_dir])
+
+    # static files are always synced by size + mtime, they never need a full recopy
+    with profile_stage("static"):
+        new_manifest["static"], copied = sync_static(
+            static_dir, dest_dir, static_ignore, link_mode, inventory
+        )
+    if images:
+        # dimensions (and resized copies, with Pillow) for the images in
+        # static/, kept next to the manifest and redone only when an image changes
+        with profile_stage("images"):
+            new_manifest["images"], processed = process_images(
+                new_manifest["static"],
+                dest_dir,
+                old_manifest["images"],
+                os.path.join(os.path.dirname(manifest_path), "images"),
+                image_widths,
+                jobs,
+                link_mode,
+            )
+        console.info(f"processed {processed} of {len(new_manifest['images'])} images")
+    rendered, total = render_changed_pages(
+        content_dir, template_path, dest_dir, old_manifest, new_manifest, inventory, incremental, jobs, block_cache, page_cache
+    )
+    if site_url is not None or section_indexes:
+        # sitemap.xml, feed.xml and section indexes from the manifest entries
+        # the render pass just filled in
+        with profile_stage("listings"):
+            new_manifest["generated"], written = write_listings(
+                new_manifest, content_dir, template_path, dest_dir, site_url, feed_size, section_indexes, feed_author, inventory
+            )
+        console.info(f"wrote {written} of {len(new_manifest['generated'])} sitemap, feed and section index files")
+    removed = remove_stale_outputs(dest_dir, old_manifest, new_manifest)
+
+    if compress:
+        # after everything's written and stale outputs are gone, so only new
+        # or changed files get (re)compressed
+        with profile_stage("compress"):
+            compress_outputs(dest_dir, new_manifest, old_manifest["compressed"], jobs)
+    else:
+        # compression turned off, the siblings from last time would go stale
+        removed += remove_orphans(old_manifest["compressed"], (), static_outputs(new_manifest))
+
+    save_manifest(manifest_path, new_manifest)
+    if link_report is not None:
+        with profile_stage("links"):
+            report_links(new_manifest, dest_dir, link_report)
+    console.info(
+        f"rendered {rendered} of {total} pages, copied {copied} static files, "
+        f"removed {removed} stale outputs"
+    )
+    if block_cache is not None:
+        console.info(f"block cache: {block_cache.hits} hits, {block_cache.misses} misses, {len(block_cache)} entries")
+    if page_cache is not None:
+        evicted = page_cache.prune()
+        console.info(f"page cache: {page_cache.hits} hits, {page_cache.misses} misses, {evicted} evicted")
+    return new_manifest
+
+def static_outputs(manifest):
+    return [entry["output"] for entry in manifest["static"].values()]
+
+def compress_outputs(dest_dir, manifest, previous, jobs=1):
+    # writes the stale .gz/.br siblings in public/ and records them all in
+    # manifest, removing the ones in previous whose source is gone
+    manifest["compressed"], compressed, up_to_date, orphans = compress_site(
+        dest_dir,
+        jobs=jobs if jobs > 1 else None,
+        previous=previous,
+        static_outputs=static_outputs(manifest),
+    )
+    console.info(f"compressed {compressed} files, {up_to_date} already up to date, removed {orphans} orphaned")
+
+def report_links(manifest, dest_dir, link_report):
+    # internal links against everything the build produced, written to the
+    # link_report path as JSON
+    report = check_links(manifest, dest_dir)
+    write_link_report(link_report, report)
+    for link in report["broken"]:
+        console.warning(f"broken {link['kind']} on {link['page']}: {link['url']}")
+    console.info(f"checked {report['checked']} internal links, {len(report['broken'])} broken, report in {link_report}")
+
+def render_changed_pages(
+    content_dir,
+    template_path,
+    dest_dir,
+    old_manifest,
+    new_manifest,
+    inventory=None,
+    incremental=True,
+    jobs=1,
+    block_cache=None,
+    page_cache=None,
+):
+    # a full build renders every page. an incremental one checks each page's
+    # dependencies from the last build (its markdown, template, partials and
+    # the static files it uses) and only renders the pages where one changed
+    if inventory is None:
+        inventory = Inventory([content_dir])
+    chooser = TemplateChooser(content_dir, template_path, inventory)
+    fingerprints = Fingerprints(new_manifest["static"])
+    # pages showing an image whose size or derivatives changed need rewriting
+    changed_images = changed_image_urls(old_manifest["images"], new_manifest["images"])
+    pages = discover_pages(content_dir, dest_dir, inventory)
+    last_build_ns = old_manifest.get("started_ns", 0)
+    # a change to the renderer's code changes every page's html, same as a
+    # template change does
+    new_manifest["renderer"] = renderer_version(page_renderer_modules)
+    renderer_changed = old_manifest["renderer"] != new_manifest["renderer"]
+    stale_pages = []
+    for from_path, dest_path in pages:
+        old_entry = old_manifest["pages"].get(from_path)
+        with profile_stage("hash"):
+            entry = plan_page(
+                from_path, dest_path, chooser, fingerprints, old_entry, inventory.stat(from_path), last_build_ns
+            )
+        new_manifest["pages"][from_path] = entry
+        if not incremental:
+            stale_pages.append((from_path, dest_path))
+            continue
+        reason = rebuild_reason(old_entry, entry["template"], fingerprints, renderer_changed)
+        if reason is None and changed_images.intersection(old_entry["metadata"]["images"]):
+            reason = "image attributes changed"
+        if reason is None:
+            # unchanged, so are its metadata and dependencies
+            entry["metadata"] = old_entry["metadata"]
+            entry["deps"] = old_entry["deps"]
+            continue
+        console.info(f"rebuilding {from_path}: {reason}")
+        stale_pages.append((from_path, dest_path))
+
+    render_pages(stale_pages, template_path, dest_dir, new_manifest, fingerprints, jobs, block_cache, page_cache)
+    return len(stale_pages), len(pages)
+
+def plan_page(from_path, dest_path, chooser, fingerprints, old_entry=None, stat=None, last_build_ns=0):
+    # the page's hash and its front matter (read from the header only), which
+    # is all it takes to pick its template. returns its manifest entry, minus
+    # what rendering adds. stat is the page's (size, mtime_ns) from the
+    # inventory: when it matches the last build's the file isn't opened at all
+    if stat is None:
+        file_stat = os.stat(from_path)
+        stat = (file_stat.st_size, file_stat.st_mtime_ns)
+    size, mtime_ns = stat
+    if stat_unchanged(old_entry, size, mtime_ns, last_build_ns):
+        digest = old_entry["hash"]
+        front_matter = old_entry["front_matter"]
+    else:
+        digest = hash_file(from_path)
+        front_matter = read_front_matter(from_path)
+    fingerprints.known[from_path] = digest
+    return {
+        "hash": digest,
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "output": os.path.join(dest_path, "index.html"),
+        "template": chooser.for_page(from_path, front_matter),
+        "front_matter": front_matter,
+    }
+
+def stat_unchanged(old_entry, size, mtime_ns, last_build_ns):
+    # same size and mtime as last build, like sync_static's check. a file
+    # written in the second before the last build started could still have
+    # changed under the same (coarse) mtime, so those get hashed anyway
+    return (
+        old_entry is not None
+        and old_entry.get("size") == size
+        and old_entry.get("mtime_ns") == mtime_ns
+        and mtime_ns < last_build_ns - racy_window_ns
+    )
+
+def render_pages(pages, template_path, dest_dir, manifest, fingerprints, jobs=1, block_cache=None, page_cache=None):
+    # renders pages, whose entries plan_page already put in the manifest, and
+    # records what each one was built from
+    entries = manifest["pages"]
+    templates = {from_path: entries[from_path]["template"] for from_path, _ in pages}
+    sizes = {from_path: entries[from_path]["size"] for from_path, _ in pages}
+    documents = generate_pages(
+        pages, template_path, jobs, block_cache, page_cache, image_index(manifest["images"]), templates, sizes
+    )
+    asset_sources = static_sources(manifest["static"], dest_dir)
+    for from_path, document in documents.items():
+        entry = entries[from_path]
+        entry["metadata"] = document.metadata()
+        entry["deps"] = page_dependencies(
+            from_path,
+            load_template(entry["template"]).dependencies,
+            entry["metadata"],
+            asset_sources,
+            fingerprints,
+        )
+
+def site_index(manifest):
+    # every page's metadata (title, headings, word count, links) by output
+    # path, straight from the manifest so nothing gets re-parsed
+    return {
+        entry["output"]: entry["metadata"]
+        for entry in manifest["pages"].values()
+        if "metadata" in entry
+    }
+
+def manifest_outputs(manifest):
+    # every file a build wrote into public/
+    for section in ("pages", "static"):
+        for entry in manifest[section].values():
+            yield entry["output"]
+    for entry in manifest.get("images", {}).values():
+        for derivative in entry["derivatives"]:
+            yield derivative["output"]
+    yield from manifest.get("generated", ())
+
+def remove_stale_outputs(dest_dir, old_manifest, new_manifest):
+    # anything the last build wrote that this one didn't gets deleted
+    live_outputs = set(manifest_outputs(new_manifest))
+
+    removed = 0
+    for output in manifest_outputs(old_manifest):
+        if output in live_outputs:
+            continue
+        if os.path.exists(output):
+            os.remove(output)
+            prune_empty_dirs(os.path.dirname(output), dest_dir)
+            removed += 1
+    return removed
+
+def prune_empty_dirs(dir, stop_dir):
+    # walk back up towards public/ removing dirs the deleted output left empty
+    stop_dir = os.path.abspath(stop_dir)
+    dir = os.path.abspath(dir)
+    while dir != stop_dir and dir.startswith(stop_dir + os.sep):
+        if os.listdir(dir):
+            break
+        os.rmdir(dir)
+        dir = os.path.dirname(dir)
@@ -0,0 +1,120 @@
+import gzip, os
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    import brotli
+except ImportError: # optional, only .gz siblings get written without it
+    brotli = None
+
+# text assets worth precompressing. images, fonts and archives are already
+# compressed so anything not listed here (e.g. static/images/*.png) is skipped
+compressible_extensions = (
+    ".html", ".css", ".js", ".mjs", ".json", ".xml", ".svg", ".txt", ".md", ".map", ".csv",
+)
+
+
+def available_formats():
+    if brotli is None:
+        return ("gz",)
+    return ("gz", "br")
+
+def gzip_bytes(data):
+    # mtime=0 keeps the output byte identical between builds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+def brotli_bytes(data):
+    return brotli.compress(data, quality=11)
+
+compressors = {
+    "gz": gzip_bytes,
+    "br": brotli_bytes,
+}
+
+def is_compressible(name):
+    return name.lower().endswith(compressible_extensions)
+
+def is_stale(src_stat, sibling_path):
+    # a sibling only needs redoing when it's missing or older than its source
+    try:
+        return os.stat(sibling_path).st_mtime_ns < src_stat.st_mtime_ns
+    except FileNotFoundError:
+        return True
+
+def compress_file(path, formats):
+    # writes the stale .gz/.br siblings of path, returns how many it wrote
+    with open(path, "rb") as f:
+        data = f.read()
+    written = 0
+    for format in formats:
+        sibling = f"{path}.{format}"
+        tmp_path = f"{sibling}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(compressors[format](data))
+        os.replace(tmp_path, sibling)
+        written += 1
+    return written
+
+def plan_compression(dest_dir, formats, static_outputs=()):
+    # one walk over public/: every sibling this build should have, and which
+    # files need which of them redone. a sibling that's a file from static/
+    # (say a hand made table.csv.gz) is left alone
+    work = []
+    siblings = []
+    skipped = 0
+    for dirpath, _, filenames in os.walk(dest_dir):
+        for name in filenames:
+            if not is_compressible(name):
+                continue
+            path = os.path.join(dirpath, name)
+            src_stat = os.stat(path)
+            stale = []
+            for format in formats:
+                sibling = f"{path}.{format}"
+                if sibling in static_outputs:
+                    continue
+                siblings.append(sibling)
+                if is_stale(src_stat, sibling):
+                    stale.append(format)
+            if stale:
+                work.append((path, stale))
+            else:
+                skipped += 1
+    return work, siblings, skipped
+
+def remove_orphans(previous, siblings, static_outputs=()):
+    # siblings the last build wrote that this one didn't, unless static/ now
+    # has a file of that name. returns how many were removed
+    current = set(siblings)
+    removed = 0
+    for path in previous:
+        if path in current or path in static_outputs:
+            continue
+        if os.path.exists(path):
+            os.remove(path)
+            removed += 1
+    return removed
+
+def compress_site(dest_dir, formats=None, jobs=None, previous=(), static_outputs=()):
+    # writes .gz (and .br when brotli is installed) next to every text asset
+    # in dest_dir, in a thread pool since zlib and brotli release the GIL.
+    # previous is the siblings the last run wrote, the only ones it deletes
+    # once their source is gone. returns (every sibling, siblings written,
+    # files already up to date, orphans removed)
+    if formats is None:
+        formats = available_formats()
+    for format in formats:
+        if format not in compressors:
+            raise ValueError(f"unknown compression format: {format}")
+        if format == "br" and brotli is None:
+            raise ValueError("brotli compression needs the brotli package installed")
+
+    static_outputs = frozenset(static_outputs)
+    work, siblings, skipped = plan_compression(dest_dir, formats, static_outputs)
+    removed = remove_orphans(previous, siblings, static_outputs)
+
+    written = 0
+    if work:
+        with ThreadPoolExecutor(max_workers=jobs or os.cpu_count()) as executor:
+            for count in executor.map(lambda item: compress_file(*item), work):
+                written += count
+    return siblings, written, skipped, removed
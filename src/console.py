@@ -0,0 +1,27 @@
+import sys
+
+# how much a build prints. quiet is only warnings and errors, normal adds a
+# summary line per stage and why each changed page is rebuilt, verbose adds a
+# line for every page written
+quiet = 0
+normal = 1
+verbose = 2
+
+level = normal
+
+
+def set_level(new_level):
+    global level
+    level = new_level
+
+def info(message):
+    if level >= normal:
+        print(message)
+
+def detail(message):
+    if level >= verbose:
+        print(message)
+
+def warning(message):
+    # always shown, on stderr so it survives > build.log
+    print(message, file=sys.stderr)
@@ -0,0 +1,139 @@
+import fnmatch, os, shutil
+from inventory import Inventory
+
+try:
+    import fcntl
+except ImportError: # windows, reflinks just fall back to copying
+    fcntl = None
+
+# editor droppings and OS metadata that should never end up in public/
+default_static_ignore = (
+    "*:Zone.Identifier",
+    ".DS_Store",
+    "Thumbs.db",
+    "desktop.ini",
+    "*.swp",
+    "*~",
+)
+
+# how sync_static puts a file in place: "copy" always copies, "hardlink" links
+# to the source file and "reflink" shares blocks on filesystems that support it
+# (btrfs, xfs...). hardlink and reflink fall back to a copy when they can't work
+link_modes = ("copy", "hardlink", "reflink")
+
+# linux FICLONE ioctl, see ioctl_ficlone(2)
+ficlone = 0x40049409
+
+
+def copy_dir(dir, dest=f"{os.getcwd()}/public", rmtree=True, inventory=None):
+    # call shutil.rmtree() on public/ dir before anything else (idempotence)
+    # set rmtree parameter to True, or False to copy over what's already there
+    check_dir(dir)
+    if rmtree and os.path.exists(dest):
+        shutil.rmtree(dest)
+    os.makedirs(dest, exist_ok=True)
+
+    if inventory is None:
+        inventory = Inventory([dir])
+    for src in inventory.files_under(dir):
+        dest_path = os.path.join(dest, os.path.relpath(src, dir))
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        shutil.copy(src, dest_path)
+
+def check_dir(dir):
+    # if input dir does not exist, then raise an exception
+    if not os.path.exists(dir):
+        raise ValueError(f"directory {dir} does not exist")
+
+    # if input dir is a regular file, then raise an exception
+    if os.path.isfile(dir):
+        raise ValueError(f"path {dir} is a regular filepath, it must be a directory")
+
+def discover_static(dir, dest, ignore=default_static_ignore, inventory=None):
+    # (source, destination) pairs for the files under dir, from the
+    # inventory's walk (or a fresh one), skipping ignored files and anything
+    # in an ignored directory
+    check_dir(dir)
+    if inventory is None:
+        inventory = Inventory([dir])
+
+    pairs = []
+    for src in inventory.files_under(dir):
+        rel_path = os.path.relpath(src, dir)
+        if any(is_ignored(name, ignore) for name in rel_path.split(os.sep)):
+            continue
+        pairs.append((src, os.path.join(dest, rel_path)))
+    return pairs
+
+def is_ignored(name, ignore):
+    for pattern in ignore:
+        if fnmatch.fnmatch(name, pattern):
+            return True
+    return False
+
+def sync_static(dir, dest, ignore=default_static_ignore, link_mode="copy", inventory=None):
+    # mirror dir into dest, only touching files whose size or mtime differ
+    # from the copy already in dest (the same quick check rsync does). every
+    # copy keeps the source mtime, so an unchanged tree costs a stat of each
+    # copy on top of the inventory walk.
+    # returns ({source: entry}, number of files copied), orphan removal is left
+    # to the caller since dest also holds generated pages
+    if link_mode not in link_modes:
+        raise ValueError(f"unknown link mode {link_mode}, must be one of {link_modes}")
+
+    if inventory is None:
+        inventory = Inventory([dir])
+    entries = {}
+    copied = 0
+    for src, dest_path in discover_static(dir, dest, ignore, inventory):
+        size, mtime_ns = inventory.stat(src)
+        entries[src] = {
+            "output": dest_path,
+            "size": size,
+            "mtime_ns": mtime_ns,
+        }
+        try:
+            dest_stat = os.stat(dest_path)
+        except FileNotFoundError:
+            dest_stat = None
+        if (
+            dest_stat is not None
+            and dest_stat.st_size == size
+            and dest_stat.st_mtime_ns == mtime_ns
+        ):
+            continue
+
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        place_file(src, dest_path, link_mode)
+        copied += 1
+    return entries, copied
+
+def place_file(src, dest, link_mode="copy"):
+    if os.path.lexists(dest):
+        os.remove(dest)
+
+    if link_mode == "hardlink":
+        try:
+            os.link(src, dest)
+            return
+        except OSError:
+            pass # different device, or links not supported, just copy it
+    elif link_mode == "reflink" and reflink_file(src, dest):
+        shutil.copystat(src, dest)
+        return
+
+    shutil.copy2(src, dest)
+
+def reflink_file(src, dest):
+    # returns False when the filesystem can't clone, leaving no dest behind.
+    # any real problem (disk full etc) will show up again in the fallback copy
+    if fcntl is None:
+        return False
+    try:
+        with open(src, "rb") as src_f, open(dest, "wb") as dest_f:
+            fcntl.ioctl(dest_f.fileno(), ficlone, src_f.fileno())
+        return True
+    except OSError:
+        if os.path.exists(dest):
+            os.remove(dest)
+        return False
@@ -0,0 +1,105 @@
+from linkcheck import output_url
+from manifest import hash_file
+import os
+
+# a template.html inside content/ applies to every page in its directory and
+# the directories below it (the nearest one wins)
+directory_template_name = "template.html"
+
+
+class TemplateChooser:
+    # picks each page's template: a "template" front matter value (relative to
+    # the default template's directory), else the nearest template.html in
+    # content/ at or above the page, else the default template. with an
+    # inventory of content/ the lookups don't touch the disk
+    def __init__(self, content_dir, default_template, inventory=None):
+        self.content_dir = os.path.normpath(content_dir)
+        self.default_template = default_template
+        self.inventory = inventory
+        self.dir_templates = {}
+
+    def for_page(self, from_path, front_matter):
+        name = front_matter.get("template")
+        if name:
+            return os.path.normpath(os.path.join(os.path.dirname(self.default_template), name))
+        return self.for_dir(os.path.normpath(os.path.dirname(from_path)))
+
+    def has_file(self, path):
+        if self.inventory is not None:
+            return self.inventory.has(path)
+        return os.path.isfile(path)
+
+    def for_dir(self, dir):
+        template = self.dir_templates.get(dir)
+        if template is not None:
+            return template
+        candidate = os.path.join(dir, directory_template_name)
+        if self.has_file(candidate):
+            template = candidate
+        elif dir == self.content_dir or os.path.dirname(dir) == dir:
+            template = self.default_template
+        else:
+            template = self.for_dir(os.path.dirname(dir))
+        self.dir_templates[dir] = template
+        return template
+
+
+class Fingerprints:
+    # what each dependency looked like during this build, worked out at most
+    # once per path: sha256 for markdown, templates and partials, size + mtime
+    # for static files (sync_static already stat'ed those). None for a file
+    # that doesn't exist
+    def __init__(self, static_entries):
+        self.static_entries = static_entries
+        self.known = {}
+
+    def get(self, path):
+        if path in self.known:
+            return self.known[path]
+        static_entry = self.static_entries.get(path)
+        if static_entry is not None:
+            fingerprint = f"{static_entry['size']}:{static_entry['mtime_ns']}"
+        else:
+            try:
+                fingerprint = hash_file(path)
+            except FileNotFoundError:
+                fingerprint = None
+        self.known[path] = fingerprint
+        return fingerprint
+
+
+def static_sources(static_entries, dest_dir):
+    # url -> static source file, so a page's links and images can be traced
+    # back to the files they use
+    return {output_url(entry["output"], dest_dir): src for src, entry in static_entries.items()}
+
+def page_dependencies(from_path, template_files, metadata, asset_sources, fingerprints):
+    # the page's edges in the dependency graph: its markdown, its template and
+    # the template's partials, and any static files it links to or shows.
+    # each with the fingerprint it had when the page was rendered
+    paths = [from_path] + list(template_files)
+    for url in metadata["images"] + metadata["links"]:
+        src = asset_sources.get(url)
+        if src is not None:
+            paths.append(src)
+    return {path: fingerprints.get(path) for path in paths}
+
+def rebuild_reason(old_entry, template_path, fingerprints, renderer_changed=False):
+    # why a page has to be rendered again, or None when nothing it was built
+    # from changed. renderer_changed is for the markdown renderer's own code,
+    # which every page depends on
+    if old_entry is None:
+        return "new page"
+    if "deps" not in old_entry or "metadata" not in old_entry:
+        return "not built before"
+    if old_entry["template"] != template_path:
+        return f"now uses {template_path}"
+    if renderer_changed:
+        return "renderer changed"
+    for path, fingerprint in old_entry["deps"].items():
+        now = fingerprints.get(path)
+        if now != fingerprint:
+            return f"{path} was removed" if now is None else f"{path} changed"
+    if not os.path.exists(old_entry["output"]):
+        return "output missing"
+    return None
@@ -0,0 +1,80 @@
+from textnode import text_type_link, text_type_img
+
+
+class Document:
+    # what one parse of a page's markdown gives back: the body html plus
+    # metadata picked up along the way, so nothing has to re-scan the source
+    # for the title, outline or links afterwards. headings (and so the title)
+    # keep their raw markdown text, the same as read_title gives
+    def __init__(self, html="", headings=None, word_count=0, links=None, images=None, front_matter=None):
+        self.html = html
+        self.headings = headings if headings is not None else [] # (level, text)
+        self.word_count = word_count
+        self.links = links if links is not None else []
+        self.images = images if images is not None else []
+        # the page's parsed front matter, kept out of metadata() since the
+        # manifest has its own copy
+        self.front_matter = front_matter if front_matter is not None else {}
+
+    @property
+    def title(self):
+        for level, text in self.headings:
+            if level == 1:
+                return text
+        return None
+
+    def add_heading(self, level, text):
+        self.headings.append((level, text))
+
+    def add_text_nodes(self, text_nodes):
+        for text_node in text_nodes:
+            if text_node.text_type == text_type_img:
+                self.images.append(text_node.url)
+                continue
+            self.word_count += len(text_node.text.split())
+            if text_node.text_type == text_type_link:
+                self.links.append(text_node.url)
+
+    def merge(self, other):
+        # folds in the metadata of a part of this document, e.g. one block
+        self.headings.extend(other.headings)
+        self.word_count += other.word_count
+        self.links.extend(other.links)
+        self.images.extend(other.images)
+
+    def metadata(self):
+        # everything but the html, as plain JSON types
+        return {
+            "title": self.title,
+            "headings": [list(heading) for heading in self.headings],
+            "word_count": self.word_count,
+            "links": list(self.links),
+            "images": list(self.images),
+        }
+
+    def template_values(self):
+        return {
+            "Title": self.title,
+            "Content": self.html,
+            "WordCount": self.word_count,
+        }
+
+    def __eq__(self, other):
+        return (
+            self.html == other.html
+            and self.metadata() == other.metadata()
+            and self.front_matter == other.front_matter
+        )
+
+    def __repr__(self):
+        return f"Document({self.title!r}, {len(self.headings)} headings, {self.word_count} words, {len(self.links)} links)"
+
+
+def document_from_metadata(metadata, html=""):
+    return Document(
+        html,
+        [tuple(heading) for heading in metadata["headings"]],
+        metadata["word_count"],
+        list(metadata["links"]),
+        list(metadata["images"]),
+    )
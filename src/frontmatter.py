@@ -0,0 +1,104 @@
+import datetime, itertools
+
+try:
+    import yaml
+except ImportError: # optional, without it front matter is "key: value" lines and "- item" lists
+    yaml = None
+
+front_matter_fence = "---"
+
+
+def front_matter_block(lines):
+    # the lines between the opening and closing --- of an iterator of lines,
+    # consuming nothing past the closing one. None when there's no front
+    # matter (or it's never closed, so it's just markdown)
+    first = next(lines, None)
+    if first is None or first.strip() != front_matter_fence:
+        return None
+    block = []
+    for line in lines:
+        if line.strip() == front_matter_fence:
+            return block
+        block.append(line.rstrip("\r\n"))
+    return None
+
+def parse_front_matter(block):
+    # YAML when PyYAML is installed and the block is a valid mapping, else
+    # "key: value" lines (so "title: a: b" still works either way), where a
+    # key with no value can be followed by "- item" lines making it a list
+    if yaml is not None:
+        try:
+            values = yaml.safe_load("\n".join(block))
+        except yaml.YAMLError:
+            values = None
+        if isinstance(values, dict):
+            return {str(key): json_value(value) for key, value in values.items()}
+    values = {}
+    list_key = None # the last key, while it has no value of its own
+    for line in block:
+        stripped = line.strip()
+        if stripped == "" or stripped.startswith("#"):
+            continue
+        if list_key is not None and (stripped == "-" or stripped.startswith("- ")):
+            if values[list_key] == "":
+                values[list_key] = []
+            values[list_key].append(stripped[1:].strip())
+            continue
+        if line[0].isspace():
+            # nested mappings and the like
+            raise ValueError(f"front matter needs PyYAML for this line: {line}")
+        key, sep, value = line.partition(":")
+        if not sep:
+            raise ValueError(f"invalid front matter line: {line}")
+        key, value = key.strip(), value.strip()
+        values[key] = value
+        list_key = key if value == "" else None
+    return values
+
+def json_value(value):
+    # front matter ends up in the manifest, so dates become iso strings
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if isinstance(value, dict):
+        return {str(k): json_value(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [json_value(v) for v in value]
+    return value
+
+def split_front_matter(markdown):
+    # an optional block of front matter between two --- lines at the very top
+    # of a page. returns (dict of values, the markdown after it)
+    if not markdown.startswith(front_matter_fence):
+        return {}, markdown
+    lines = markdown.split("\n")
+    block = front_matter_block(iter(lines))
+    if block is None:
+        return {}, markdown
+    return parse_front_matter(block), "\n".join(lines[len(block) + 2:])
+
+def skip_front_matter(lines):
+    # the lines after the front matter, for a page read line by line
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return iter(())
+    if first.strip() != front_matter_fence:
+        return itertools.chain([first], lines)
+    block = [first]
+    for line in lines:
+        block.append(line)
+        if line.strip() == front_matter_fence:
+            return lines
+    return iter(block) # never closed, so it's all markdown
+
+def read_front_matter(path):
+    # the metadata only scan: reads a page's front matter without touching the
+    # body, so listing a big site costs about the header of each file
+    with open(path, encoding="utf-8") as f:
+        block = front_matter_block(f)
+    if block is None:
+        return {}
+    try:
+        return parse_front_matter(block)
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from None
@@ -0,0 +1,260 @@
+from block_markdown import (
+    markdown_to_document, heading_hash_pattern, scan_blocks, iter_blocks_html,
+    block_type_heading, heading_text,
+)
+from document import Document
+from frontmatter import split_front_matter, skip_front_matter, read_front_matter
+from images import add_image_attributes
+from inventory import Inventory
+from listings import replace_if_changed
+from template import load_template
+import console, profiler
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import os
+
+# markdown files bigger than this get streamed (see stream_page) instead of
+# read, rendered and cached whole
+stream_threshold = 8 * 1024 * 1024
+
+# each pool worker gets its own copy of the parent's block cache, see init_worker
+worker_block_cache = None
+worker_page_cache = None
+
+def init_worker(block_cache, page_cache=None):
+    global worker_block_cache, worker_page_cache
+    worker_block_cache = block_cache
+    worker_page_cache = page_cache
+    if block_cache is not None:
+        block_cache.added = []
+
+def render_markdown(markdown, block_cache=None):
+    # the CPU heavy part of building a page, kept separate from file IO so
+    # it can run in a worker process. one parse gives the html and the title
+    # (and the rest of the Document metadata)
+    front_matter, body = split_front_matter(markdown)
+    document = markdown_to_document(body, block_cache)
+    document.front_matter = front_matter
+    if document.title is None:
+        raise ValueError("invalid markdown syntax: must contain at least one h1 block")
+    return document
+
+def render_page_file(from_path):
+    # returns (Document, block cache entries this page added) so the parent's
+    # cache, the one that gets saved, hears about them
+    with open(from_path, encoding="utf-8") as f:
+        markdown = f.read()
+    document = render_markdown(markdown, worker_block_cache)
+    if worker_page_cache is not None:
+        # the parent already looked this page up and missed
+        worker_page_cache.put(markdown, document)
+    if worker_block_cache is None:
+        return document, []
+    return document, worker_block_cache.take_added()
+
+def page_values(document, images=None):
+    # template values for a rendered page. images is an image index (url ->
+    # width/height/srcset), applied to the finished html
+    # front matter keys fill same named slots ({{ date }}, {{ author }}), the
+    # built in Title/Content/WordCount win over them
+    values = dict(document.front_matter)
+    values.update(document.template_values())
+    # except a front matter title, which wins over the first h1 here just like
+    # in the sitemap, feed and section indexes (see listings.page_title)
+    if document.front_matter.get("title") is not None:
+        values["Title"] = str(document.front_matter["title"])
+    if images and document.images:
+        values["Content"] = add_image_attributes(document.html, images)
+    return values
+
+def write_page(dest_path, template, values):
+    # values fills the template slots, e.g. {"Title": ..., "Content": ...}.
+    # Content can be the rendered html string, an html node or a function
+    # returning html fragments, the last two get streamed straight into the
+    # file instead of joined first. an unchanged page keeps its old file,
+    # and with it the mtime compression and syncing public/ go by
+    dest = os.path.join(dest_path, "index.html")
+    with open(f"{dest}.tmp", "w", encoding="utf-8") as f:
+        template.write(f, values)
+    replace_if_changed(f"{dest}.tmp", dest)
+
+def read_title(from_path):
+    # the first h1, found by scanning blocks without rendering any. it's
+    # almost always near the top so this stops after a few lines
+    with open(from_path, encoding="utf-8") as f:
+        for block in scan_blocks(skip_front_matter(f)):
+            if block.block_type == block_type_heading and heading_hash_pattern.match(block.text).group() == "#":
+                return heading_text(block.text)
+    raise ValueError("invalid markdown syntax: must contain at least one h1 block")
+
+def stream_page(from_path, template, dest_path, block_cache=None, images=None):
+    # for huge pages: the markdown is read line by line, blocks come out of the
+    # scanner lazily and each one's html goes straight into the output file,
+    # so memory is bounded by the largest block rather than the page. the
+    # returned Document has the metadata but no html, and the page cache is
+    # skipped since it would need the html whole. WordCount is only right in
+    # templates that put it after Content
+    title = read_title(from_path)
+    document = Document(front_matter=read_front_matter(from_path))
+    with open(from_path, encoding="utf-8") as f:
+        blocks = scan_blocks(skip_front_matter(f))
+
+        def content():
+            for html in iter_blocks_html(blocks, block_cache, document):
+                yield add_image_attributes(html, images) if images else html
+
+        values = page_values(document)
+        if values["Title"] is None:
+            values["Title"] = title
+        values["Content"] = content
+        values["WordCount"] = lambda: [str(document.word_count)]
+        write_page(dest_path, template, values)
+    return document
+
+def write_html(dest_path, html):
+    dest = os.path.join(dest_path, "index.html")
+    with open(f"{dest}.tmp", "w", encoding="utf-8") as f:
+        f.write(html)
+    replace_if_changed(f"{dest}.tmp", dest)
+
+def generate_page(from_path, template_path, dest_path, block_cache=None, page_cache=None, images=None, size=None):
+    # returns the page's Document so callers can index its metadata. size is
+    # the markdown file's, when the caller already has it from a walk
+    console.detail(f"generating page from {from_path} and placing in {dest_path} using {template_path}")
+    if size is None:
+        size = os.path.getsize(from_path)
+    if size > stream_threshold:
+        with profiler.profile_page(from_path), profiler.profile_stage("stream"):
+            return stream_page(from_path, load_template(template_path), dest_path, block_cache, images)
+    with profiler.profile_page(from_path):
+        # read markdown from from_path
+        with profiler.profile_stage("read"):
+            with open(from_path, encoding="utf-8") as f:
+                markdown = f.read()
+
+        # parsed once per process and cached
+        with profiler.profile_stage("template load"):
+            template = load_template(template_path)
+
+        document = None
+        if page_cache is not None:
+            # rendered by an earlier build, only the template is left to fill
+            with profiler.profile_stage("page cache"):
+                document = page_cache.get(markdown)
+
+        if document is None:
+            with profiler.profile_stage("render"):
+                document = render_markdown(markdown, block_cache)
+            if page_cache is not None:
+                with profiler.profile_stage("page cache"):
+                    page_cache.put(markdown, document)
+
+        values = page_values(document, images)
+        if profiler.active_profiler is None:
+            with profiler.profile_stage("write"):
+                write_page(dest_path, template, values)
+        else:
+            # filled into a string first when profiling, so substitution and
+            # the file write show up as separate stages
+            with profiler.profile_stage("template"):
+                html = template.render(values)
+            with profiler.profile_stage("write"):
+                write_html(dest_path, html)
+    return document
+
+def generate_pages(
+    pages, template_path, jobs=1, block_cache=None, page_cache=None, images=None, templates=None, sizes=None
+):
+    # pages is a list of (markdown path, output dir) pairs, e.g. from discover_pages.
+    # templates maps a markdown path to its own template, the rest use
+    # template_path. sizes maps a markdown path to its size in bytes, so
+    # pages planned from an inventory aren't stat-ed again. returns
+    # {markdown path: Document}
+    templates = templates or {}
+    sizes = sizes or {}
+    documents = {}
+    if jobs <= 1 or len(pages) <= 1:
+        for from_path, dest_path in pages:
+            os.makedirs(dest_path, exist_ok=True)
+            page_template = templates.get(from_path, template_path)
+            documents[from_path] = generate_page(
+                from_path, page_template, dest_path, block_cache, page_cache, images, sizes.get(from_path)
+            )
+        return documents
+
+    # huge pages are streamed here, a worker would have to send their html back whole
+    small_pages = []
+    for from_path, dest_path in pages:
+        size = sizes.get(from_path)
+        if size is None:
+            size = os.path.getsize(from_path)
+        if size <= stream_threshold:
+            small_pages.append((from_path, dest_path))
+            continue
+        os.makedirs(dest_path, exist_ok=True)
+        page_template = templates.get(from_path, template_path)
+        documents[from_path] = generate_page(from_path, page_template, dest_path, block_cache, None, images, size)
+    pages = small_pages
+
+    if page_cache is not None:
+        # page cache hits are just a template fill, not worth a round trip
+        # through the pool
+        misses = []
+        for from_path, dest_path in pages:
+            with open(from_path, encoding="utf-8") as f:
+                document = page_cache.get(f.read())
+            if document is None:
+                misses.append((from_path, dest_path))
+                continue
+            page_template = templates.get(from_path, template_path)
+            console.detail(f"generated page from {from_path} and placing in {dest_path} using {page_template}")
+            os.makedirs(dest_path, exist_ok=True)
+            write_page(dest_path, load_template(page_template), page_values(document, images))
+            documents[from_path] = document
+        pages = misses
+        if not pages:
+            return documents
+
+    # parse + render in the pool, write in this process as results come back
+    # worker caches start from the parent's entries and send back what they
+    # add with each page, hit/miss counters only cover the parent process
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=init_worker, initargs=(block_cache, page_cache)
+    ) as executor:
+        futures = {
+            executor.submit(render_page_file, from_path): (from_path, dest_path)
+            for from_path, dest_path in pages
+        }
+        for future in as_completed(futures):
+            from_path, dest_path = futures[future]
+            document, added = future.result()
+            if block_cache is not None:
+                block_cache.add_entries(added)
+            page_template = templates.get(from_path, template_path)
+            console.detail(f"generated page from {from_path} and placing in {dest_path} using {page_template}")
+            os.makedirs(dest_path, exist_ok=True)
+            write_page(dest_path, load_template(page_template), page_values(document, images))
+            documents[from_path] = document
+    return documents
+
+def generate_pages_recursive(content_dir_path, template_path, dest_dir_path, inventory=None):
+    # render every index.md under content_dir_path, one at a time
+    if inventory is None:
+        inventory = Inventory([content_dir_path])
+    for from_path, dest_path in discover_pages(content_dir_path, dest_dir_path, inventory):
+        os.makedirs(dest_path, exist_ok=True)
+        size, _ = inventory.stat(from_path)
+        generate_page(from_path, template_path, dest_path, size=size)
+
+def discover_pages(content_dir_path, dest_dir_path, inventory=None):
+    # (markdown path, output dir) pairs for every index.md under
+    # content_dir_path, from the inventory's walk (or a fresh one)
+    if not os.path.isdir(content_dir_path):
+        raise ValueError(f"directory {content_dir_path} does not exist")
+    if inventory is None:
+        inventory = Inventory([content_dir_path])
+    pages = []
+    for path in inventory.files_under(content_dir_path):
+        if os.path.basename(path) == "index.md":
+            rel_dir = os.path.relpath(os.path.dirname(path), content_dir_path)
+            pages.append((path, os.path.normpath(os.path.join(dest_dir_path, rel_dir))))
+    return pages
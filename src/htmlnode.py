@@ -1,4 +1,8 @@
 class HTMLNode:
+    # slots instead of a per-instance __dict__, a big page builds a node for
+    # every inline fragment. props stays None (not {}) when there are none so
+    # nodes without attributes don't each carry an empty dict
+    __slots__ = ("tag", "value", "children", "props")
 
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
@@ -7,8 +11,17 @@ class HTMLNode:
         self.props = props
 
     def to_html(self):
+        return "".join(self.iter_html())
+
+    def iter_html(self):
+        # yields the serialized html in fragments, so big trees can be written
+        # out without building the whole document string first
         raise NotImplementedError()
 
+    def write_html(self, fp):
+        # fp is anything with a write method, an open file or io.StringIO
+        fp.writelines(self.iter_html())
+
     def props_to_html(self):
         if self.props is None:
             return ""
@@ -32,6 +45,7 @@ class HTMLNode:
 
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
 
     def __init__(self, tag, value=None, props=None):
         super().__init__(tag=tag, value=value, props=props)
@@ -45,27 +59,33 @@ class LeafNode(HTMLNode):
 
         return f"<{self.tag + self.props_to_html()}>{self.value}</{self.tag}>"
 
+    def iter_html(self):
+        yield self.to_html()
+
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
 
 class ParentNode(HTMLNode):
+    __slots__ = ()
 
     def __init__(self, tag, children=None, props=None):
         super().__init__(tag=tag, children=children, props=props)
 
-    def to_html(self):
+    def iter_html(self):
         if self.tag is None:
             raise ValueError("html parent nodes must have a tag")
 
         if self.children is None:
             raise ValueError("html parent nodes must have child nodes")
 
-        html = f"<{self.tag + self.props_to_html()}>"
+        yield f"<{self.tag + self.props_to_html()}>"
         for node in self.children: # base case is contained in for loop? (don't recurse if self.children is empty)
-            html += node.to_html()
-
-        html += f"</{self.tag}>"
-        return html
+            if isinstance(node, LeafNode):
+                # leaves are a single fragment, skip the extra generator
+                yield node.to_html()
+            else:
+                yield from node.iter_html()
+        yield f"</{self.tag}>"
 
     def __repr__(self):
         return f"ParentNode({self.tag}, children: {self.children}, {self.props})"
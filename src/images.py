@@ -0,0 +1,216 @@
+import os, re, struct
+from concurrent.futures import ProcessPoolExecutor
+from linkcheck import output_url
+from manifest import hash_file
+from copystatic import place_file
+
+try:
+    from PIL import Image
+except ImportError: # optional, without it images still get width/height but no resized copies
+    Image = None
+
+default_image_cache_dir = ".ssg-cache/images"
+default_image_widths = (480, 960, 1600)
+
+image_extensions = (".png", ".jpg", ".jpeg", ".gif", ".webp")
+
+# the exact markup text_node_to_html (and LeafNode) write for an image
+img_tag_pattern = re.compile(r'<img src="([^"]*)" alt="([^"]*)"></img>')
+
+
+def is_image(path):
+    return path.lower().endswith(image_extensions)
+
+def read_image_size(path):
+    # (width, height) from the file header, so dimensions don't need Pillow.
+    # None for anything it can't make sense of
+    with open(path, "rb") as f:
+        head = f.read(32)
+        if head.startswith(b"\x89PNG\r\n\x1a\n") and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+            return read_webp_size(head)
+        if head[:2] == b"\xff\xd8":
+            f.seek(2)
+            return read_jpeg_size(f)
+    return None
+
+def read_webp_size(head):
+    chunk = head[12:16]
+    if chunk == b"VP8X":
+        width = int.from_bytes(head[24:27], "little") + 1
+        height = int.from_bytes(head[27:30], "little") + 1
+        return width, height
+    if chunk == b"VP8L":
+        bits = int.from_bytes(head[21:25], "little")
+        return (bits & 0x3FFF) + 1, ((bits >> 14) & 0x3FFF) + 1
+    if chunk == b"VP8 ":
+        width, height = struct.unpack("<HH", head[26:30])
+        return width & 0x3FFF, height & 0x3FFF
+    return None
+
+def read_jpeg_size(f):
+    # walk the segments until a start of frame marker, which has the size
+    while True:
+        marker = f.read(2)
+        if len(marker) < 2 or marker[0] != 0xFF:
+            return None
+        if marker[1] in (0xD8, 0x01) or 0xD0 <= marker[1] <= 0xD7:
+            continue # markers without a length
+        length = f.read(2)
+        if len(length) < 2:
+            return None
+        segment_length = struct.unpack(">H", length)[0]
+        if 0xC0 <= marker[1] <= 0xCF and marker[1] not in (0xC4, 0xC8, 0xCC):
+            height, width = struct.unpack(">xHH", f.read(5))
+            return width, height
+        f.seek(segment_length - 2, 1)
+
+def derivative_path(path, width):
+    # public/images/a.png -> public/images/a-480w.png
+    root, ext = os.path.splitext(path)
+    return f"{root}-{width}w{ext}"
+
+def process_image(src, digest, widths, cache_dir):
+    # runs in the pool: decodes src once and writes a resized copy for every
+    # width narrower than the original into the content addressed cache
+    # (skipping ones already there). returns (width, height, [(width, cache path)])
+    if Image is None:
+        return header_only(src)
+
+    ext = os.path.splitext(src)[1].lower()
+    derivatives = []
+    try:
+        image = Image.open(src)
+    except OSError: # something Pillow can't decode, the header may still do
+        return header_only(src)
+    with image:
+        width, height = image.size
+        for target in sorted(widths):
+            if target >= width:
+                continue
+            cache_path = os.path.join(cache_dir, f"{digest[:32]}-{target}w{ext}")
+            if not os.path.exists(cache_path):
+                os.makedirs(cache_dir, exist_ok=True)
+                resized = image.resize((target, round(height * target / width)), Image.LANCZOS)
+                tmp_path = f"{cache_path}.{os.getpid()}.tmp"
+                resized.save(tmp_path, format=image.format, optimize=True)
+                os.replace(tmp_path, cache_path)
+            derivatives.append((target, cache_path))
+    return width, height, derivatives
+
+def header_only(src):
+    size = read_image_size(src)
+    if size is None:
+        return None, None, []
+    return size[0], size[1], []
+
+def process_images(
+    static_entries,
+    dest_dir,
+    old_images,
+    cache_dir=default_image_cache_dir,
+    widths=default_image_widths,
+    jobs=1,
+    link_mode="copy",
+):
+    # static_entries is the manifest "static" section from sync_static, the
+    # originals are already in public/. returns ({source: entry}, images
+    # processed). an image whose content hash matches the last build's entry
+    # is never decoded again, its derivatives just get put back if missing
+    images = {}
+    todo = []
+    for src, static_entry in static_entries.items():
+        if not is_image(src):
+            continue
+        old_entry = old_images.get(src)
+        if (
+            old_entry
+            and old_entry["size"] == static_entry["size"]
+            and old_entry["mtime_ns"] == static_entry["mtime_ns"]
+        ):
+            digest = old_entry["hash"]
+        else:
+            digest = hash_file(src)
+        if old_entry and old_entry["hash"] == digest and old_entry["widths"] == list(widths):
+            entry = dict(old_entry, size=static_entry["size"], mtime_ns=static_entry["mtime_ns"])
+            if all(os.path.exists(d["cache"]) for d in entry["derivatives"]):
+                for derivative in entry["derivatives"]:
+                    if not os.path.exists(derivative["output"]):
+                        place_file(derivative["cache"], derivative["output"], link_mode)
+                images[src] = entry
+                continue
+        todo.append((src, digest, static_entry))
+
+    if jobs > 1 and len(todo) > 1 and Image is not None:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(
+                process_image,
+                [src for src, _, _ in todo],
+                [digest for _, digest, _ in todo],
+                [widths] * len(todo),
+                [cache_dir] * len(todo),
+            ))
+    else:
+        results = [process_image(src, digest, widths, cache_dir) for src, digest, _ in todo]
+
+    for (src, digest, static_entry), (width, height, derivatives) in zip(todo, results):
+        entry = {
+            "hash": digest,
+            "size": static_entry["size"],
+            "mtime_ns": static_entry["mtime_ns"],
+            "url": output_url(static_entry["output"], dest_dir),
+            "width": width,
+            "height": height,
+            "widths": list(widths),
+            "derivatives": [],
+        }
+        for target, cache_path in derivatives:
+            output = derivative_path(static_entry["output"], target)
+            place_file(cache_path, output, link_mode)
+            entry["derivatives"].append({
+                "width": target,
+                "cache": cache_path,
+                "output": output,
+                "url": output_url(output, dest_dir),
+            })
+        images[src] = entry
+    return images, len(todo)
+
+def image_index(images):
+    # url -> the attributes every <img> pointing at it should get
+    index = {}
+    for entry in images.values():
+        if entry["width"] is None:
+            continue
+        attributes = {"width": entry["width"], "height": entry["height"]}
+        if entry["derivatives"]:
+            candidates = [f"{d['url']} {d['width']}w" for d in entry["derivatives"]]
+            candidates.append(f"{entry['url']} {entry['width']}w")
+            attributes["srcset"] = ", ".join(candidates)
+        index[entry["url"]] = attributes
+    return index
+
+def changed_image_urls(old_images, new_images):
+    # urls whose attributes differ between two builds, pages showing them
+    # need rewriting
+    old_index = image_index(old_images)
+    new_index = image_index(new_images)
+    return {
+        url for url in old_index.keys() | new_index.keys()
+        if old_index.get(url) != new_index.get(url)
+    }
+
+def add_image_attributes(html, index):
+    # fills in width/height/srcset on the rendered <img> tags. done on the
+    # final html rather than in the renderer so cached blocks and pages never
+    # hold stale dimensions. only site absolute urls (/images/a.png) match
+    def replace(match):
+        attributes = index.get(match.group(1))
+        if attributes is None:
+            return match.group()
+        extra = "".join(f' {name}="{value}"' for name, value in attributes.items())
+        return f'<img src="{match.group(1)}" alt="{match.group(2)}"{extra}></img>'
+    return img_tag_pattern.sub(replace, html)
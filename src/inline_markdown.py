@@ -110,24 +110,118 @@ def split_nodes_link(old_nodes):
 
     return new_nodes
 
+# one alternation for every inline syntax, so a single regex search finds the
+# next inline node instead of re-splitting the node list once per syntax.
+# delimiters can't appear inside images/links since the old split passes would
+# have already broken them up before the image and link passes saw them
+link_token_sources = (
+    r"!\[(?P<image_alt>[^*`\n]*?)\]\((?P<image_url>[^*`\n]*?)\)",
+    r"\[(?P<link_text>[^*`\n]*?)\]\((?P<link_url>[^*`\n]*?)\)",
+)
+delimiter_token_sources = (
+    r"\*\*(?P<bold>.*?)\*\*",
+    r"\*(?!\*)(?P<italic>[^*]*)\*",
+    r"`(?P<code>[^`]*)`",
+)
+# group name -> (pattern, function making the TextNode from its match), see
+# register_inline_syntax
+registered_inline_syntaxes = {}
+
+def compile_inline_token_pattern():
+    # registered syntaxes go after images and links but before the built in
+    # delimiters, so they can use * and ` themselves
+    registered = tuple(
+        f"(?P<{name}>{pattern.pattern})" for name, (pattern, _) in registered_inline_syntaxes.items()
+    )
+    return re.compile("|".join(link_token_sources + registered + delimiter_token_sources), re.DOTALL)
+
+inline_token_pattern = compile_inline_token_pattern()
+
+def register_inline_syntax(text_type, pattern, to_text_node=None):
+    # teaches text_to_textnodes a new inline syntax. pattern is a regex
+    # without named groups, to_text_node(match) builds the node and defaults
+    # to TextNode(match.group(1), text_type). the html for text_type still
+    # comes from textnode.register_text_type
+    global inline_token_pattern
+    pattern = re.compile(pattern, re.DOTALL)
+    if pattern.groupindex:
+        raise ValueError("inline syntax patterns can't use named groups")
+    if to_text_node is None:
+        if pattern.groups == 0:
+            raise ValueError("inline syntax pattern needs a group for the node text")
+        to_text_node = lambda match: TextNode(match.group(1), text_type)
+    name = f"syntax{len(registered_inline_syntaxes)}"
+    registered_inline_syntaxes[name] = (pattern, to_text_node)
+    inline_token_pattern = compile_inline_token_pattern()
+image_pattern = re.compile(r"!\[([^*`\n]*?)\]\(([^*`\n]*?)\)")
+unmatched_delimiter_pattern = re.compile(r"\*\*|\*|`")
+
 def text_to_textnodes(text):
-    node = TextNode(text, text_type_text)
-    nodes = split_nodes_delimiter([node], "**", text_type_bold)
-    nodes = split_nodes_delimiter(nodes, "*", text_type_italic)
-    nodes = split_nodes_delimiter(nodes, "`", text_type_code)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    # single left to right pass over text, produces the same nodes as running
+    # split_nodes_delimiter (**, *, `), split_nodes_image and split_nodes_link
+    # one after another
+    nodes = []
+    plain_start = 0 # start of the plain text that hasn't become a node yet
+    i = 0
+    while True:
+        match = inline_token_pattern.search(text, i)
+        if match is None:
+            break
+        kind = match.lastgroup
+        start, end = match.span()
+        if kind == "link_url" and text.find("![", start, end) != -1 and contains_image(text, start, end):
+            # images win over links, so a link that swallows an image isn't one
+            i = start + 1
+            continue
 
+        if start != plain_start:
+            add_plain_text(text[plain_start:start], nodes)
+        if kind == "image_url":
+            nodes.append(TextNode(match.group("image_alt"), text_type_img, match.group("image_url")))
+        elif kind == "link_url":
+            nodes.append(TextNode(match.group("link_text"), text_type_link, match.group("link_url")))
+        elif kind in registered_inline_syntaxes:
+            pattern, to_text_node = registered_inline_syntaxes[kind]
+            nodes.append(to_text_node(pattern.fullmatch(text, start, end)))
+        elif match.group(kind) != "":
+            # an empty span still ends the text node in front of it, same as str.split did
+            nodes.append(TextNode(match.group(kind), inline_text_types[kind]))
+        i = plain_start = end
+
+    if plain_start != len(text):
+        add_plain_text(text[plain_start:], nodes)
     return nodes
 
+inline_text_types = {
+    "bold": text_type_bold,
+    "italic": text_type_italic,
+    "code": text_type_code,
+}
+
+def add_plain_text(plain, nodes):
+    # any delimiter left over in plain text never found its partner
+    if "*" in plain or "`" in plain:
+        unmatched = unmatched_delimiter_pattern.search(plain)
+        raise Exception(f"invalid markdown syntax: unmatched instance of delimiter: {unmatched.group()} found near {plain[unmatched.start():unmatched.start() + 20]}")
+    nodes.append(TextNode(plain, text_type_text))
+
+def contains_image(text, start, end):
+    bang = text.find("![", start, end)
+    while bang != -1:
+        if image_pattern.match(text, bang):
+            return True
+        bang = text.find("![", bang + 2, end)
+    return False
+
+markdown_image_pattern = re.compile(r"!\[(.*?)\]\((.*?)\)")
+markdown_link_pattern = re.compile(r"\[(.*?)\]\((.*?)\)")
+
 def extract_markdown_images(text):
 
     # pull out all markdown image strings using regex
-    img_regex = r"!\[(.*?)\]\((.*?)\)"
-    image_matches = re.findall(img_regex, text)
+    image_matches = markdown_image_pattern.findall(text)
     return image_matches
 
 def extract_markdown_links(text):
-    link_regex = r"\[(.*?)\]\((.*?)\)"
-    link_matches = re.findall(link_regex, text)
+    link_matches = markdown_link_pattern.findall(text)
     return link_matches
@@ -0,0 +1,53 @@
+import os
+
+
+class Inventory:
+    # every file under some directories from one os.scandir walk, keeping the
+    # (size, mtime_ns) scandir's entries already had. the page discovery,
+    # static sync, template lookup and watch snapshots all read from this
+    # instead of stat-ing (and isfile-ing) each path again. files are in walk
+    # order: each directory's entries sorted by name, depth first
+    def __init__(self, roots=()):
+        self.files = {}
+        self.roots = []
+        for root in roots:
+            self.add_tree(root)
+
+    def add_tree(self, root):
+        # a single file works too, a missing root just adds nothing
+        root = os.path.normpath(root)
+        self.roots.append(root)
+        if os.path.isfile(root):
+            stat = os.stat(root)
+            self.files[root] = (stat.st_size, stat.st_mtime_ns)
+            return
+        self.scan_dir(root)
+
+    def scan_dir(self, dir):
+        try:
+            with os.scandir(dir) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except (FileNotFoundError, NotADirectoryError):
+            return # deleted mid-walk (or never there)
+        for entry in entries:
+            path = os.path.join(dir, entry.name)
+            if entry.is_dir():
+                self.scan_dir(path)
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                continue
+            self.files[path] = (stat.st_size, stat.st_mtime_ns)
+
+    def has(self, path):
+        return path in self.files
+
+    def stat(self, path):
+        # (size, mtime_ns), or None for a path the walk didn't see
+        return self.files.get(path)
+
+    def files_under(self, dir):
+        # paths below dir, in walk order
+        prefix = os.path.join(os.path.normpath(dir), "")
+        return [path for path in self.files if path.startswith(prefix)]
@@ -0,0 +1,95 @@
+import json
+import os
+from urllib.parse import unquote, urljoin, urlsplit
+
+default_link_report_path = ".ssg-cache/links.json"
+
+
+def output_url(output, dest_dir):
+    # public/majesty/index.html -> /majesty/, public/images/a.png -> /images/a.png
+    rel_path = os.path.relpath(output, dest_dir).replace(os.sep, "/")
+    if rel_path == "index.html":
+        return "/"
+    if rel_path.endswith("/index.html"):
+        return "/" + rel_path[:-len("index.html")]
+    return "/" + rel_path
+
+def is_external(url):
+    # anything with a scheme (http:, mailto:, ...) or a protocol relative //host
+    parts = urlsplit(url)
+    return parts.scheme != "" or parts.netloc != ""
+
+def link_index(manifest, dest_dir):
+    # page url -> the links and images it points at, from the metadata the
+    # render pass already left in the manifest
+    index = {}
+    for entry in manifest["pages"].values():
+        metadata = entry.get("metadata")
+        if metadata is None:
+            continue
+        index[output_url(entry["output"], dest_dir)] = {
+            "links": metadata["links"],
+            "images": metadata["images"],
+        }
+    return index
+
+def site_targets(manifest, dest_dir):
+    # every url the site can serve: pages (with and without the trailing
+    # slash or index.html) and static files
+    targets = set()
+    for entry in manifest["pages"].values():
+        url = output_url(entry["output"], dest_dir)
+        targets.add(url)
+        targets.add(url + "index.html")
+        if url != "/":
+            targets.add(url.rstrip("/"))
+    for entry in manifest["static"].values():
+        targets.add(output_url(entry["output"], dest_dir))
+    for output in manifest.get("generated", ()):
+        url = output_url(output, dest_dir)
+        targets.add(url)
+        if url.endswith("/"):
+            targets.add(url + "index.html")
+            if url != "/":
+                targets.add(url.rstrip("/"))
+    return targets
+
+def check_links(manifest, dest_dir):
+    # one pass over every page's links against the set of generated targets,
+    # external urls are counted but not fetched
+    index = link_index(manifest, dest_dir)
+    targets = site_targets(manifest, dest_dir)
+    broken = []
+    checked = 0
+    external = 0
+    for page_url in sorted(index):
+        for kind in ("links", "images"):
+            for url in index[page_url][kind]:
+                if is_external(url):
+                    external += 1
+                    continue
+                checked += 1
+                path = unquote(urlsplit(urljoin(page_url, url)).path)
+                if path == "" or path in targets:
+                    # "" is a same page #fragment or ?query
+                    continue
+                broken.append({
+                    "page": page_url,
+                    "kind": kind[:-1],
+                    "url": url,
+                    "resolved": path,
+                })
+    return {
+        "pages": len(index),
+        "checked": checked,
+        "external": external,
+        "broken": broken,
+        "index": index,
+    }
+
+def write_link_report(path, report):
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,184 @@
+import datetime, filecmp, heapq, os
+from html import escape
+from depgraph import TemplateChooser
+from linkcheck import output_url
+from template import load_template
+
+default_feed_size = 20
+sitemap_name = "sitemap.xml"
+feed_name = "feed.xml"
+
+
+def page_title(entry):
+    # a "title" in front matter wins over the page's first h1
+    title = entry["front_matter"].get("title")
+    if title is None:
+        title = entry["metadata"]["title"]
+    return str(title)
+
+def page_date(from_path, front_matter):
+    # the front matter "date" as an aware datetime (utc when it has no
+    # offset), None for an undated page
+    value = front_matter.get("date")
+    if value is None:
+        return None
+    try:
+        date = datetime.datetime.fromisoformat(str(value))
+    except ValueError:
+        raise ValueError(f"invalid date in {from_path}: {value}") from None
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=datetime.timezone.utc)
+    return date
+
+def replace_if_changed(tmp_path, path):
+    # keeps the old file (and its mtime) when nothing changed, so compression
+    # and anything syncing public/ leave it alone
+    if os.path.exists(path) and filecmp.cmp(tmp_path, path, shallow=False):
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, path)
+    return True
+
+def sitemap_url(loc, date):
+    if date is None:
+        return f"<url><loc>{escape(loc)}</loc></url>\n"
+    return f"<url><loc>{escape(loc)}</loc><lastmod>{date.isoformat()}</lastmod></url>\n"
+
+def write_listings(
+    manifest,
+    content_dir,
+    template_path,
+    dest_dir,
+    site_url=None,
+    feed_size=default_feed_size,
+    section_indexes=False,
+    feed_author=None,
+    inventory=None,
+):
+    # one pass over the pages' manifest entries, using their front matter and
+    # rendered metadata so no page gets read again. with a site_url, streams
+    # sitemap.xml as it goes and keeps the feed_size newest dated pages in a
+    # bounded heap for an atom feed.xml, credited to feed_author (the root
+    # page's title when there isn't one). with section_indexes, every directory
+    # in public/ that has pages below it but no index.md of its own gets an
+    # index.html listing them. returns (outputs, how many were rewritten)
+    dest_dir = os.path.normpath(dest_dir)
+    sitemap = None
+    if site_url is not None:
+        site_url = site_url.rstrip("/")
+        sitemap_path = os.path.join(dest_dir, sitemap_name)
+        sitemap = open(f"{sitemap_path}.tmp", "w")
+        sitemap.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        sitemap.write('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n')
+
+    newest = []
+    # section dir -> {child dir: title}, None for a child that's a section too
+    children = {}
+    page_dirs = set()
+    root_title = None
+    try:
+        for from_path, entry in manifest["pages"].items():
+            url = output_url(entry["output"], dest_dir)
+            title = page_title(entry)
+            date = page_date(from_path, entry["front_matter"])
+            if sitemap is not None:
+                sitemap.write(sitemap_url(site_url + url, date))
+            if url == "/":
+                root_title = title
+            if date is not None and feed_size > 0:
+                item = (date, url, title)
+                if len(newest) < feed_size:
+                    heapq.heappush(newest, item)
+                else:
+                    heapq.heappushpop(newest, item)
+            if section_indexes:
+                dir = os.path.dirname(os.path.normpath(entry["output"]))
+                page_dirs.add(dir)
+                if dir == dest_dir:
+                    continue
+                children.setdefault(os.path.dirname(dir), {})[dir] = title
+                # make sure every directory on the way up lists the one below it
+                dir = os.path.dirname(dir)
+                while dir != dest_dir:
+                    parent = children.setdefault(os.path.dirname(dir), {})
+                    if dir in parent:
+                        break
+                    parent[dir] = None
+                    dir = os.path.dirname(dir)
+
+        sections = sorted(dir for dir in children if dir not in page_dirs)
+        if sitemap is not None:
+            for dir in sections:
+                sitemap.write(sitemap_url(site_url + section_url(dir, dest_dir), None))
+            sitemap.write("</urlset>\n")
+    finally:
+        if sitemap is not None:
+            sitemap.close()
+
+    outputs = []
+    written = 0
+    if site_url is not None:
+        outputs.append(sitemap_path)
+        written += replace_if_changed(f"{sitemap_path}.tmp", sitemap_path)
+        feed_path = os.path.join(dest_dir, feed_name)
+        outputs.append(feed_path)
+        title = root_title or site_url
+        written += write_feed(feed_path, site_url, title, feed_author or title, sorted(newest, reverse=True))
+
+    chooser = TemplateChooser(content_dir, template_path, inventory)
+    for dir in sections:
+        output = os.path.join(dir, "index.html")
+        content_path = os.path.join(content_dir, os.path.relpath(dir, dest_dir))
+        outputs.append(output)
+        written += write_section_index(
+            output, chooser.for_dir(os.path.normpath(content_path)), section_name(dir, dest_dir), children[dir], dest_dir
+        )
+    return outputs, written
+
+def section_url(dir, dest_dir):
+    return output_url(os.path.join(dir, "index.html"), dest_dir)
+
+def section_name(dir, dest_dir):
+    if dir == dest_dir:
+        return "index"
+    return os.path.basename(dir)
+
+def write_feed(path, site_url, title, author, entries):
+    # entries are (date, url, title), newest first. atom needs an author for
+    # every entry, the feed level one covers them all
+    updated = entries[0][0] if entries else datetime.datetime.fromtimestamp(0, datetime.timezone.utc)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+        f.write('<feed xmlns="http://www.w3.org/2005/Atom">\n')
+        f.write(f"<title>{escape(title)}</title>\n")
+        f.write(f"<id>{escape(site_url)}/</id>\n")
+        f.write(f'<link href="{escape(site_url)}/"/>\n')
+        f.write(f'<link rel="self" href="{escape(site_url)}/{feed_name}"/>\n')
+        f.write(f"<updated>{updated.isoformat()}</updated>\n")
+        f.write(f"<author><name>{escape(author)}</name></author>\n")
+        for date, url, entry_title in entries:
+            f.write("<entry>")
+            f.write(f"<title>{escape(entry_title)}</title>")
+            f.write(f"<id>{escape(site_url + url)}</id>")
+            f.write(f'<link href="{escape(site_url + url)}"/>')
+            f.write(f"<updated>{date.isoformat()}</updated>")
+            f.write("</entry>\n")
+        f.write("</feed>\n")
+    return replace_if_changed(tmp_path, path)
+
+def write_section_index(output, template_path, name, children, dest_dir):
+    # a plain list of the pages and sections right below dir, through the
+    # same template its pages would get
+    items = []
+    for child in sorted(children):
+        title = children[child]
+        if title is None:
+            title = os.path.basename(child)
+        items.append(f'<li><a href="{escape(section_url(child, dest_dir))}">{escape(title)}</a></li>')
+    content = f"<div><h1>{escape(name)}</h1><ul>{''.join(items)}</ul></div>"
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    tmp_path = f"{output}.tmp"
+    with open(tmp_path, "w") as f:
+        load_template(template_path).write(f, {"Title": name, "Content": content, "WordCount": 0})
+    return replace_if_changed(tmp_path, output)
@@ -1,105 +1,249 @@
-from textnode import *
-from htmlnode import HTMLNode, LeafNode, ParentNode
-from inline_markdown import split_nodes_delimiter
-from block_markdown import (
-    markdown_to_blocks,
-    block_to_block_type,
-    block_to_heading,
-    markdown_to_html_node,
-    block_type_heading,
-    block_type_paragraph,
-    block_type_code,
-    block_type_quote,
-    block_type_unordered_list,
-    block_type_ordered_list,
-)
-import os, shutil, re
-from pathlib import Path
+from block_cache import BlockCache, default_block_cache_size, default_block_cache_path
+from build import build_site
+from compress import available_formats
+from images import default_image_widths
+from copystatic import default_static_ignore, link_modes
+from linkcheck import default_link_report_path
+from listings import default_feed_size, sitemap_name, feed_name
+from manifest import default_manifest_path
+from page_cache import PageCache, default_page_cache_dir, default_page_cache_mb
+from profiler import default_profile_path, start_profiling, stop_profiling
+from watch import watch
+import argparse, console
 
-def main():
-    cwd = os.getcwd()
-    copy_dir(f"{cwd}/static")
-    generate_pages_recursive("content", "template.html", "public")
-
-def copy_dir(dir, dest=f"{os.getcwd()}/public", rmtree=True):
-    # call shutil.rmtree() on public/ dir before anything else (idempotence)
-    # set rmtree parameter to True for first function call, all else False
-    if rmtree and os.path.exists(dest):
-        shutil.rmtree(dest)
-    os.mkdir(dest)
-
-    # if input dir does not exist, then raise an exception
-    if not os.path.exists(dir):
-        raise ValueError(f"directory {dir} does not exist")
-
-    # if input dir is a regular file, then raise an exception
-    if os.path.isfile(dir):
-        raise ValueError(f"path {dir} is a regular filepath, it must be a directory")
-
-    # walk the files in the current dir
-    files = os.listdir(dir)
-    for file in files:
-        filepath = os.path.join(dir, file)
-        # if the filepath is a regular file, copy it to new dir
-        if os.path.isfile(filepath):
-            shutil.copy(filepath, dest)
-        # if the filepath is a dir, keep recursing
-        else:
-            next_dest = os.path.join(dest, file)
-            copy_dir(filepath, next_dest, rmtree=False)
-
-def extract_title(markdown):
-    # need to test this
-    child_blocks = markdown_to_blocks(markdown)
-    hash_pattern = re.compile(r"#*")
-    for block in child_blocks:
-        hashes = hash_pattern.match(block).group()
-        if len(hashes) == 1:
-            title = block.lstrip("# ")
-            return title
-    raise ValueError("invalid markdown syntax: must contain at least one h1 block")
-
-def generate_page(from_path, template_path, dest_path):
-    print(f"generating page from {from_path} and placing in {dest_path} using {template_path}")
-
-    # read markdown from from_path
-    with open(from_path) as f:
-        markdown = f.read()
 
-    # open template
-    with open(template_path) as f:
-        template = f.read()
-
-    # generate HTML and capture title from markdown
-    outer_html_node = markdown_to_html_node(markdown)
-    html_content = outer_html_node.to_html()
-    title = extract_title(markdown)
-
-    # replace template params with title and HTML content
-    html_doc = template.replace("{{ Title }}", title).replace("{{ Content }}", html_content)
-
-    # TODO: write doc to dest_path, probably need to make some dirs
-    dest = os.path.join(dest_path, "index.html")
-    with open (dest, "w") as f:
-        f.write(html_doc)
-
-def generate_pages_recursive(content_dir_path, template_path, dest_dir_path):
-    # walk the dirs in content_dir_path to to find the index.md's
-    files = os.listdir(content_dir_path)
-    for file in files:
-        content_path = Path(content_dir_path, file)
-        print(content_path)
-        if os.path.isfile(content_path) and file == "index.md":
-            dest_path = Path(dest_dir_path)
-            print(dest_path)
-            generate_page(content_path, template_path, dest_path)
-        else:
-            dest_path = Path(dest_dir_path, file)
-            print(dest_path)
-            if not os.path.exists(dest_path):
-                os.makedirs(dest_path)
-            generate_pages_recursive(content_path, template_path, dest_path)
-
-
-
-main()
+def main():
+    parser = argparse.ArgumentParser(description="Static site generator")
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="only rebuild pages and static files that changed since the last build",
+    )
+    parser.add_argument(
+        "--manifest",
+        type=str,
+        help="where to keep the content-hash manifest between builds",
+        default=default_manifest_path,
+    )
+    parser.add_argument(
+        "--clean",
+        action="store_true",
+        help="wipe public/ and rebuild everything from scratch",
+    )
+    parser.add_argument(
+        "--static-ignore",
+        action="append",
+        metavar="PATTERN",
+        help="glob for static files to skip, can be repeated (added to the defaults)",
+        default=[],
+    )
+    parser.add_argument(
+        "--link-static",
+        choices=link_modes,
+        help="how to put static files into public/",
+        default="copy",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        help="number of worker processes to render pages with",
+        default=1,
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="keep running and rebuild whatever changes in content/, static/ or the template",
+    )
+    parser.add_argument(
+        "--block-cache",
+        type=int,
+        nargs="?",
+        const=default_block_cache_size,
+        metavar="SIZE",
+        help="reuse rendered html for repeated markdown blocks, keeping up to SIZE blocks",
+        default=0,
+    )
+    parser.add_argument(
+        "--block-cache-file",
+        type=str,
+        nargs="?",
+        const=default_block_cache_path,
+        metavar="PATH",
+        help=f"persist the block cache to this file between builds, {default_block_cache_path} when no PATH is given (implies --block-cache)",
+        default=None,
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help=f"don't reuse or store rendered pages in {default_page_cache_dir}",
+    )
+    parser.add_argument(
+        "--page-cache-mb",
+        type=int,
+        help="how big the on-disk page cache can grow before old entries are evicted",
+        default=default_page_cache_mb,
+    )
+    parser.add_argument(
+        "--compress",
+        action="store_true",
+        help=f"write precompressed siblings ({', '.join(available_formats())}) of the html, css and other text files in public/",
+    )
+    parser.add_argument(
+        "--images",
+        action="store_true",
+        help="add width/height to <img> tags, plus resized copies and srcset when Pillow is installed",
+    )
+    parser.add_argument(
+        "--image-widths",
+        type=lambda value: tuple(int(width) for width in value.split(",")),
+        metavar="W1,W2,...",
+        help=f"widths to make resized copies of images at (default {','.join(map(str, default_image_widths))})",
+        default=default_image_widths,
+    )
+    parser.add_argument(
+        "--site-url",
+        type=str,
+        metavar="URL",
+        help=f"the site's public url, e.g. https://example.com. writes {sitemap_name} and an atom {feed_name}",
+        default=None,
+    )
+    parser.add_argument(
+        "--feed-size",
+        type=int,
+        help="how many of the newest pages with a front matter date go in the feed",
+        default=default_feed_size,
+    )
+    parser.add_argument(
+        "--feed-author",
+        type=str,
+        metavar="NAME",
+        help="the author named in the feed (default the home page's title)",
+        default=None,
+    )
+    parser.add_argument(
+        "--section-indexes",
+        action="store_true",
+        help="give every directory with pages below it but no index.md of its own a generated index page",
+    )
+    parser.add_argument(
+        "--link-report",
+        type=str,
+        help="where to write the JSON link index and broken link report",
+        default=default_link_report_path,
+    )
+    parser.add_argument(
+        "--no-link-check",
+        action="store_true",
+        help="skip checking internal links after the build",
+    )
+    verbosity = parser.add_mutually_exclusive_group()
+    verbosity.add_argument(
+        "--quiet",
+        "-q",
+        action="store_const",
+        const=console.quiet,
+        dest="console_level",
+        help="only print warnings and errors",
+        default=console.normal,
+    )
+    verbosity.add_argument(
+        "--verbose",
+        "-v",
+        action="store_const",
+        const=console.verbose,
+        dest="console_level",
+        help="also print a line for every page written",
+    )
+    parser.add_argument(
+        "--profile",
+        type=str,
+        nargs="?",
+        const=default_profile_path,
+        metavar="PATH",
+        help=f"time every build stage per page and write a JSON report (default {default_profile_path}). pages are always rendered, the page cache is off",
+        default=None,
+    )
+    parser.add_argument(
+        "--profile-top",
+        type=int,
+        help="how many of the slowest pages to list after a --profile build",
+        default=10,
+    )
+    args = parser.parse_args()
+    if args.watch and args.profile:
+        parser.error("--profile times a single build, it can't be used with --watch")
+    console.set_level(args.console_level)
+    static_ignore = default_static_ignore + tuple(args.static_ignore)
+
+    block_cache = None
+    if args.block_cache or args.block_cache_file:
+        block_cache = BlockCache(args.block_cache or default_block_cache_size)
+        if args.block_cache_file:
+            block_cache.load(args.block_cache_file)
+
+    page_cache = None
+    # a profile of page cache hits would show no parse or render time at all
+    if not args.no_cache and not args.profile:
+        page_cache = PageCache(default_page_cache_dir, args.page_cache_mb * 1024 * 1024)
+
+    if args.watch:
+        watch(
+            "content",
+            "template.html",
+            "static",
+            "public",
+            args.manifest,
+            static_ignore=static_ignore,
+            link_mode=args.link_static,
+            block_cache=block_cache,
+            page_cache=page_cache,
+            images=args.images,
+            image_widths=args.image_widths,
+            site_url=args.site_url,
+            feed_size=args.feed_size,
+            section_indexes=args.section_indexes,
+            feed_author=args.feed_author,
+            jobs=args.jobs,
+            compress=args.compress,
+            link_report=None if args.no_link_check else args.link_report,
+        )
+    else:
+        if args.profile:
+            # worker processes can't report back into the profiler
+            args.jobs = 1
+            start_profiling()
+        build_site(
+            "content",
+            "template.html",
+            "static",
+            "public",
+            args.manifest,
+            incremental=args.incremental,
+            jobs=args.jobs,
+            clean=args.clean,
+            static_ignore=static_ignore,
+            link_mode=args.link_static,
+            block_cache=block_cache,
+            page_cache=page_cache,
+            link_report=None if args.no_link_check else args.link_report,
+            compress=args.compress,
+            images=args.images,
+            image_widths=args.image_widths,
+            site_url=args.site_url,
+            feed_size=args.feed_size,
+            section_indexes=args.section_indexes,
+            feed_author=args.feed_author,
+        )
+        if args.profile:
+            build_profiler = stop_profiling()
+            build_profiler.write_json(args.profile)
+            print(build_profiler.format_table(args.profile_top))
+            print(f"profile written to {args.profile}")
+
+    if args.block_cache_file:
+        block_cache.save(args.block_cache_file)
+
+
+if __name__ == "__main__":
+    main()
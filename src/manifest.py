@@ -0,0 +1,54 @@
+import hashlib
+import json
+import os
+
+manifest_version = 8
+default_manifest_path = ".ssg-cache/manifest.json"
+
+
+def hash_file(path, chunk_size=1 << 16):
+    # read in chunks so big static files (images etc) don't get slurped whole
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        chunk = f.read(chunk_size)
+        while chunk:
+            digest.update(chunk)
+            chunk = f.read(chunk_size)
+    return digest.hexdigest()
+
+
+def empty_manifest():
+    return {
+        "version": manifest_version,
+        "renderer": None,
+        "pages": {},
+        "static": {},
+        "images": {},
+        "generated": [],
+        "compressed": [],
+    }
+
+
+def load_manifest(path):
+    # a missing or unreadable manifest just means a cold build
+    if not os.path.exists(path):
+        return empty_manifest()
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return empty_manifest()
+    if manifest.get("version") != manifest_version:
+        return empty_manifest()
+    return manifest
+
+
+def save_manifest(path, manifest):
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    # write to a temp file first so a crashed build can't leave half a manifest
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
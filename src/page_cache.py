@@ -0,0 +1,97 @@
+from block_cache import renderer_modules, renderer_version
+from document import document_from_metadata
+import hashlib
+import json
+import os
+import shutil
+
+default_page_cache_dir = ".ssg-cache/pages"
+default_page_cache_mb = 64
+
+# a cached entry is a whole Document, so a change to how it's put together
+# has to invalidate cached pages as well as a change to the renderer itself
+page_renderer_modules = renderer_modules + ("frontmatter.py", "gencontent.py")
+
+
+def page_key(markdown):
+    return hashlib.blake2b(markdown.encode(), digest_size=16).hexdigest()
+
+
+class PageCache:
+    # the rendered Document (body html + metadata) per page, stored on disk as one small JSON
+    # file per entry so builds (and worker processes) share it. entries live
+    # in a directory named after the renderer version, so when the parser
+    # code changes the old entries are simply never looked at again and
+    # prune() deletes them
+    def __init__(self, dir=default_page_cache_dir, max_bytes=default_page_cache_mb * 1024 * 1024):
+        self.dir = dir
+        self.max_bytes = max_bytes
+        self.version = renderer_version(page_renderer_modules)[:16]
+        self.version_dir = os.path.join(dir, self.version)
+        self.hits = 0
+        self.misses = 0
+
+    def entry_path(self, markdown):
+        return os.path.join(self.version_dir, f"{page_key(markdown)}.json")
+
+    def get(self, markdown):
+        # a Document or None. a hit bumps the entry's mtime, which is what
+        # prune() evicts by
+        path = self.entry_path(markdown)
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        document = document_from_metadata(entry["metadata"], entry["html"])
+        document.front_matter = entry["front_matter"]
+        return document
+
+    def put(self, markdown, document):
+        os.makedirs(self.version_dir, exist_ok=True)
+        path = self.entry_path(markdown)
+        # workers can be writing entries at the same time, keep tmp names apart
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {"html": document.html, "metadata": document.metadata(), "front_matter": document.front_matter},
+                f,
+            )
+        os.replace(tmp_path, path)
+
+    def prune(self):
+        # drops entries from other renderer versions, then the least recently
+        # used entries until the cache fits in max_bytes. returns how many
+        # entries were removed
+        removed = 0
+        if not os.path.isdir(self.dir):
+            return removed
+        for name in os.listdir(self.dir):
+            path = os.path.join(self.dir, name)
+            if name != self.version and os.path.isdir(path):
+                removed += len(os.listdir(path))
+                shutil.rmtree(path)
+        if not os.path.isdir(self.version_dir):
+            return removed
+
+        entries = []
+        total = 0
+        with os.scandir(self.version_dir) as it:
+            for entry in it:
+                stat = entry.stat()
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total += stat.st_size
+        entries.sort()
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            os.remove(path)
+            total -= size
+            removed += 1
+        return removed
+
+    def __repr__(self):
+        return f"PageCache({self.version_dir}, {self.hits} hits, {self.misses} misses)"
@@ -0,0 +1,175 @@
+import inspect
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager, nullcontext
+
+default_profile_path = ".ssg-cache/profile.json"
+
+# set while a --profile build is running, everything else checks this through
+# profile_stage() so a normal build pays nothing for the instrumentation
+active_profiler = None
+
+no_profiling = nullcontext()
+
+
+class BuildProfiler:
+    # records wall time and call counts per build stage, both for the whole
+    # build and for whichever page is being rendered at the time. stages nest
+    # (inline parsing happens inside block parsing) so times are exclusive:
+    # a stage's time doesn't include the stages running inside it
+    def __init__(self):
+        self.stages = {}
+        self.pages = {}
+        self.current_page = None
+        self.stack = []
+        self.started = time.perf_counter()
+        self.finished = None
+
+    def start(self, name):
+        self.stack.append([name, time.perf_counter(), 0.0])
+
+    def stop(self, calls=1):
+        name, start, child_time = self.stack.pop()
+        elapsed = time.perf_counter() - start
+        if self.stack:
+            self.stack[-1][2] += elapsed
+        self.record(self.stages, name, elapsed - child_time, calls)
+        if self.current_page is not None:
+            self.record(self.pages[self.current_page]["stages"], name, elapsed - child_time, calls)
+
+    def record(self, stages, name, seconds, calls=1):
+        totals = stages.setdefault(name, [0.0, 0])
+        totals[0] += seconds
+        totals[1] += calls
+
+    @contextmanager
+    def stage(self, name):
+        self.start(name)
+        try:
+            yield
+        finally:
+            self.stop()
+
+    @contextmanager
+    def page(self, path):
+        path = str(path)
+        self.pages[path] = {"stages": {}, "seconds": 0.0}
+        self.current_page = path
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.pages[path]["seconds"] = time.perf_counter() - start
+            self.current_page = None
+
+    def slowest_pages(self, top_n=10):
+        ranked = sorted(self.pages.items(), key=lambda item: item[1]["seconds"], reverse=True)
+        return ranked[:top_n]
+
+    def report(self):
+        finished = self.finished or time.perf_counter()
+        return {
+            "total_seconds": finished - self.started,
+            "stages": stages_to_json(self.stages),
+            "pages": {
+                path: {"seconds": page["seconds"], "stages": stages_to_json(page["stages"])}
+                for path, page in self.pages.items()
+            },
+        }
+
+    def write_json(self, path):
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+
+    def format_table(self, top_n=10):
+        lines = [f"{'stage':<20}{'calls':>10}{'ms':>12}"]
+        for name, (seconds, calls) in sorted(self.stages.items(), key=lambda item: -item[1][0]):
+            lines.append(f"{name:<20}{calls:>10}{seconds * 1000:>12.2f}")
+        lines.append("")
+        lines.append(f"{'slowest pages':<60}{'ms':>12}  slowest stage")
+        for path, page in self.slowest_pages(top_n):
+            worst = max(page["stages"].items(), key=lambda item: item[1][0], default=("-", [0.0, 0]))
+            lines.append(f"{path:<60}{page['seconds'] * 1000:>12.2f}  {worst[0]}")
+        return "\n".join(lines)
+
+
+def stages_to_json(stages):
+    return {
+        name: {"seconds": seconds, "calls": calls}
+        for name, (seconds, calls) in stages.items()
+    }
+
+def profile_stage(name):
+    if active_profiler is None:
+        return no_profiling
+    return active_profiler.stage(name)
+
+def profile_page(path):
+    if active_profiler is None:
+        return no_profiling
+    return active_profiler.page(path)
+
+def timed(function, name):
+    def wrapper(*args, **kwargs):
+        active_profiler.start(name)
+        try:
+            return function(*args, **kwargs)
+        finally:
+            active_profiler.stop()
+    wrapper.__wrapped__ = function
+    return wrapper
+
+def timed_generator(function, name):
+    # a generator does its work a step at a time while the caller does other
+    # things in between, so time each step and count the whole run as one call
+    def wrapper(*args, **kwargs):
+        iterator = function(*args, **kwargs)
+        while True:
+            active_profiler.start(name)
+            try:
+                item = next(iterator)
+            except StopIteration:
+                active_profiler.stop(calls=1)
+                return
+            except BaseException:
+                active_profiler.stop(calls=1)
+                raise
+            active_profiler.stop(calls=0)
+            yield item
+    wrapper.__wrapped__ = function
+    return wrapper
+
+# (module name, function name, stage) for the hot functions that are too fine
+# grained for a profile_stage() call in their body, they get wrapped instead
+instrumented_functions = (
+    ("block_markdown", "scan_blocks", "scan_blocks"),
+    ("block_markdown", "text_to_textnodes", "inline"),
+)
+
+def start_profiling():
+    # swaps timed wrappers into the modules that call the hot functions,
+    # stop_profiling puts the originals back
+    global active_profiler
+    active_profiler = BuildProfiler()
+    for module_name, function_name, name in instrumented_functions:
+        module = sys.modules[module_name]
+        function = getattr(module, function_name)
+        wrap = timed_generator if inspect.isgeneratorfunction(function) else timed
+        setattr(module, function_name, wrap(function, name))
+    return active_profiler
+
+def stop_profiling():
+    global active_profiler
+    for module_name, function_name, _ in instrumented_functions:
+        module = sys.modules[module_name]
+        function = getattr(module, function_name)
+        setattr(module, function_name, getattr(function, "__wrapped__", function))
+    profiler = active_profiler
+    profiler.finished = time.perf_counter()
+    active_profiler = None
+    return profiler
@@ -0,0 +1,46 @@
+import contextlib
+import io
+import os
+import tempfile
+import unittest
+
+import console
+
+
+class TempDirTestCase(unittest.TestCase):
+    # a fresh temporary directory per test at self.root, and write() to fill
+    # it with text or bytes
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.root = self.tmp.name
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, relpath, data):
+        path = os.path.join(self.root, relpath)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb" if isinstance(data, bytes) else "w") as f:
+            f.write(data)
+        return path
+
+
+class SiteTestCase(TempDirTestCase):
+    # a two page site laid out like a real one, with the paths build_site
+    # takes. the console is quiet so builds don't print over the test run,
+    # and its warnings (which quiet still shows) end up in self.warnings
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "public")
+        self.template = os.path.join(self.root, "template.html")
+        self.manifest_path = os.path.join(self.root, ".ssg-cache", "manifest.json")
+
+        self.write("template.html", "<title>{{ Title }}</title>{{ Content }}")
+        self.write("content/index.md", "# home\n\nwelcome")
+        self.write("content/about/index.md", "# about\n\nall about it")
+        self.write("static/index.css", "body {}")
+
+        self.addCleanup(console.set_level, console.level)
+        console.set_level(console.quiet)
+        self.warnings = io.StringIO()
+        self.enterContext(contextlib.redirect_stderr(self.warnings))
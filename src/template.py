@@ -0,0 +1,96 @@
+import os, re
+
+# {{ Name }} slots, whitespace inside the braces is optional
+template_slot_pattern = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+# {{> partials/nav.html }} pulls in another file, relative to the including one
+template_partial_pattern = re.compile(r"\{\{>\s*([^\s}]+)\s*\}\}")
+
+# path -> (stat signature, Template), so each process only parses a template once
+template_cache = {}
+
+
+class Template:
+
+    def __init__(self, text, dependencies=()):
+        # chunks alternate static text and slot names: even indexes are static
+        # text, odd indexes are slot names, and there's always a static chunk
+        # at both ends (possibly empty)
+        self.chunks = template_slot_pattern.split(text)
+        # the files this template was put together from (itself first, then
+        # its partials), for the build's dependency tracking
+        self.dependencies = list(dependencies)
+
+    @property
+    def slots(self):
+        return self.chunks[1::2]
+
+    def iter_render(self, values):
+        # values maps slot name -> str, an html node, or a function returning
+        # an iterable of html fragments. nodes and functions get streamed in
+        # fragment by fragment. missing slots render as empty strings
+        for i, chunk in enumerate(self.chunks):
+            if i % 2 == 0:
+                if chunk != "":
+                    yield chunk
+                continue
+            value = values.get(chunk)
+            if value is None:
+                continue
+            if hasattr(value, "iter_html"):
+                yield from value.iter_html()
+            elif callable(value):
+                yield from value()
+            else:
+                yield str(value)
+
+    def render(self, values):
+        return "".join(self.iter_render(values))
+
+    def write(self, fp, values):
+        fp.writelines(self.iter_render(values))
+
+    def __repr__(self):
+        return f"Template(slots: {self.slots})"
+
+
+def compile_template(text):
+    return Template(text)
+
+def expand_partials(path, dependencies, including=()):
+    # the text of path with every {{> partial }} inlined (recursively).
+    # appends each file read to dependencies
+    path = os.path.normpath(path)
+    if path in including:
+        raise ValueError(f"template partial {path} includes itself")
+    with open(path) as f:
+        text = f.read()
+    dependencies.append(path)
+    dir = os.path.dirname(path)
+    return template_partial_pattern.sub(
+        lambda match: expand_partials(os.path.join(dir, match.group(1)), dependencies, including + (path,)),
+        text,
+    )
+
+def file_signature(path):
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+def load_template(path):
+    # re-parse only when the template or one of its partials changes on disk,
+    # checked via size + mtime
+    key = os.path.abspath(path)
+    cached = template_cache.get(key)
+    if cached is not None:
+        signatures, template = cached
+        try:
+            if all(file_signature(dep) == signature for dep, signature in signatures):
+                return template
+        except FileNotFoundError:
+            pass
+
+    dependencies = []
+    text = expand_partials(path, dependencies)
+    template = Template(text, dependencies)
+    template_cache[key] = ([(dep, file_signature(dep)) for dep in dependencies], template)
+    return template
@@ -0,0 +1,73 @@
+import unittest
+import os
+import tempfile
+
+from block_cache import BlockCache, block_key
+from block_markdown import markdown_to_html_node
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_get_put_and_counters(self):
+        cache = BlockCache()
+        self.assertIsNone(cache.get("# heading"))
+        cache.put("# heading", "<h1>heading</h1>")
+        self.assertEqual(cache.get("# heading"), "<h1>heading</h1>")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_added_entries_move_between_caches(self):
+        worker = BlockCache()
+        worker.added = []
+        worker.put("a", "<p>a</p>")
+        parent = BlockCache(max_entries=1)
+        parent.put("b", "<p>b</p>")
+        parent.add_entries(worker.take_added())
+        self.assertEqual(worker.added, [])
+        self.assertEqual(parent.get("a"), "<p>a</p>")
+        self.assertEqual(len(parent), 1)
+
+    def test_lru_eviction(self):
+        cache = BlockCache(max_entries=2)
+        cache.put("a", "<p>a</p>")
+        cache.put("b", "<p>b</p>")
+        cache.get("a")
+        cache.put("c", "<p>c</p>")
+        self.assertEqual(len(cache), 2)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), "<p>a</p>")
+
+    def test_cached_render_matches_uncached(self):
+        markdown = """# title
+
+shared **disclaimer** with a [link](/x)
+
+* one
+* two
+
+shared **disclaimer** with a [link](/x)"""
+        cache = BlockCache()
+        self.assertEqual(
+            markdown_to_html_node(markdown, cache).to_html(),
+            markdown_to_html_node(markdown).to_html()
+        )
+        self.assertEqual((cache.hits, cache.misses), (1, 3))
+        markdown_to_html_node(markdown, cache)
+        self.assertEqual(cache.hits, 5)
+
+    def test_save_and_load(self):
+        cache = BlockCache()
+        cache.put("some block", "<p>some block</p>")
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "cache", "blocks.json")
+            cache.save(path)
+            loaded = BlockCache()
+            loaded.load(path)
+            self.assertEqual(loaded.entries, {block_key("some block"): "<p>some block</p>"})
+
+    def test_load_missing_file(self):
+        cache = BlockCache()
+        cache.load("/nonexistent/blocks.json")
+        self.assertEqual(len(cache), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
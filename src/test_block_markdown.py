@@ -11,13 +11,24 @@ from block_markdown import (
     block_to_unordered_list,
     block_to_ordered_list,
     markdown_to_html_node,
+    markdown_to_html,
+    iter_markdown_html,
     block_type_code,
     block_type_heading,
     block_type_ordered_list,
     block_type_paragraph,
     block_type_quote,
     block_type_unordered_list,
+    Block,
+    iter_lines,
+    scan_blocks,
+    register_block_type,
+    block_node_builders,
+    block_html_builders,
+    extra_block_types,
+    markdown_to_document,
 )
+from block_cache import BlockCache
 from htmlnode import ParentNode, LeafNode
 
 class TestMarkdownToBlocks(unittest.TestCase):
@@ -58,6 +69,70 @@ This is the same paragraph on a new line
             ]
         )
 
+    def test_extra_blank_lines(self):
+        self.assertEqual(
+            markdown_to_blocks("\n\none\n\n\n\ntwo\n   \nthree\n\n\n"),
+            ["one", "two", "three"]
+        )
+
+    def test_crlf(self):
+        self.assertEqual(
+            markdown_to_blocks("# heading\r\n\r\nline one\r\nline two\r\n"),
+            ["# heading", "line one\nline two"]
+        )
+
+    def test_code_fence_with_blank_lines(self):
+        markdown = "intro\n\n```\nfirst\n\n\nsecond\n```\n\noutro"
+        self.assertEqual(
+            markdown_to_blocks(markdown),
+            ["intro", "```\nfirst\n\n\nsecond\n```", "outro"]
+        )
+        self.assertEqual(
+            markdown_to_html(markdown),
+            "<div><p>intro</p><pre><code> first   second </code></pre><p>outro</p></div>"
+        )
+
+    def test_unclosed_code_fence(self):
+        self.assertEqual(
+            markdown_to_blocks("```\nnot code\n\nstill a paragraph"),
+            ["```\nnot code", "still a paragraph"]
+        )
+
+
+class TestScanBlocks(unittest.TestCase):
+    def test_types_and_offsets(self):
+        markdown = "# title\n\n  some text\nmore\n\n\n1. a\n2. b\n\n> quote"
+        self.assertEqual(
+            list(scan_blocks(iter_lines(markdown))),
+            [
+                Block("# title", block_type_heading, 1, 0),
+                Block("some text\nmore", block_type_paragraph, 3, 11),
+                Block("1. a\n2. b", block_type_ordered_list, 7, 28),
+                Block("> quote", block_type_quote, 10, 39),
+            ]
+        )
+        for block in scan_blocks(iter_lines(markdown)):
+            self.assertTrue(markdown[block.offset:].startswith(block.text.split("\n")[0]))
+            self.assertEqual(block.block_type, block_to_block_type(block.text))
+
+    def test_trailing_whitespace_is_stripped_before_classifying(self):
+        for markdown in ("1. a\n2. ", "1. a\n2. \n\nnext", "1. "):
+            with self.subTest(markdown):
+                for block in scan_blocks(iter_lines(markdown)):
+                    self.assertEqual(block.block_type, block_to_block_type(block.text))
+        self.assertEqual(markdown_to_html("1. a\n2. "), "<div><p>1. a 2.</p></div>")
+
+    def test_reads_lines_from_iterator(self):
+        lines = iter(["* a\n", "* b\n", "\n", "```\n", "code\n", "\n", "```\n"])
+        self.assertEqual(
+            [(block.text, block.block_type) for block in scan_blocks(lines)],
+            [
+                ("* a\n* b", block_type_unordered_list),
+                ("```\ncode\n\n```", block_type_code),
+            ]
+        )
+
+
 class TestBlockToBlockType(unittest.TestCase):
     def test_is_ordered_list(self):
         self.assertEqual(
@@ -287,5 +362,86 @@ no attribution
             div_node
         )
 
+class TestMarkdownToHtml(unittest.TestCase):
+    def test_matches_tree_render(self):
+        markdown = """# an h1 with **bold**
+
+a paragraph with a [link](https://boot.dev) and an ![image](/img.png)
+that spans two lines
+
+###### a tiny heading
+
+```int main()```
+
+> some *quoted* text
+> on multiple lines
+
+* first `item`
+- second item
+
+1. first thing
+2. second thing"""
+        self.assertEqual(
+            markdown_to_html(markdown),
+            markdown_to_html_node(markdown).to_html()
+        )
+
+    def test_iter_markdown_html_yields_blocks(self):
+        self.assertEqual(
+            list(iter_markdown_html("# title\n\nsome text")),
+            ["<div>", "<h1>title</h1>", "<p>some text</p>", "</div>"]
+        )
+
+    def test_register_block_type(self):
+        register_block_type(
+            "rule",
+            lambda block: LeafNode("hr", ""),
+            matches=lambda block: block == "---",
+        )
+        try:
+            markdown = "above\n\n---\n\nbelow"
+            self.assertEqual(block_to_block_type("---"), "rule")
+            self.assertEqual(markdown_to_html(markdown), "<div><p>above</p><hr></hr><p>below</p></div>")
+            self.assertEqual(markdown_to_html_node(markdown).to_html(), markdown_to_html(markdown))
+        finally:
+            del block_node_builders["rule"]
+            del block_html_builders["rule"]
+            extra_block_types.clear()
+        self.assertEqual(block_to_block_type("---"), block_type_paragraph)
+
+
+class TestMarkdownToDocument(unittest.TestCase):
+    markdown = """# the **title**
+
+an intro with a [link](/a) and ![a picture](/pic.png)
+
+## part one
+
+* see [b](/b)
+* done
+
+# second h1"""
+
+    def test_metadata(self):
+        document = markdown_to_document(self.markdown)
+        self.assertEqual(document.html, markdown_to_html(self.markdown))
+        self.assertEqual(document.title, "the **title**")
+        self.assertEqual(
+            document.headings,
+            [(1, "the **title**"), (2, "part one"), (1, "second h1")]
+        )
+        self.assertEqual(document.links, ["/a", "/b"])
+        self.assertEqual(document.images, ["/pic.png"])
+        self.assertEqual(document.word_count, 15)
+
+    def test_block_cache_keeps_metadata(self):
+        cache = BlockCache()
+        markdown_to_document(self.markdown, cache)
+        self.assertEqual(markdown_to_document(self.markdown, cache), markdown_to_document(self.markdown))
+        self.assertEqual(cache.hits, 5)
+
+    def test_no_title(self):
+        self.assertIsNone(markdown_to_document("## only an h2").title)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,292 @@
+import unittest
+import contextlib
+import io
+import os
+import re
+import tempfile
+
+import console
+from sitetest import SiteTestCase, TempDirTestCase
+from block_cache import BlockCache
+from build import build_site, site_index, plan_page
+from depgraph import TemplateChooser, Fingerprints
+from copystatic import sync_static
+from manifest import hash_file, load_manifest, empty_manifest, save_manifest
+
+
+class TestIncrementalBuild(SiteTestCase):
+    def build(self, incremental=True, jobs=1):
+        return build_site(
+            self.content,
+            self.template,
+            self.static,
+            self.public,
+            self.manifest_path,
+            incremental=incremental,
+            jobs=jobs,
+        )
+
+    def read_outputs(self):
+        outputs = {}
+        for dirpath, _, filenames in os.walk(self.public):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                with open(path, "rb") as f:
+                    outputs[os.path.relpath(path, self.public)] = f.read()
+        return outputs
+
+    def rebuilt_pages(self):
+        # what an incremental build says it rendered again. an unchanged
+        # output keeps its mtime, so that can't tell
+        console.set_level(console.normal)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.build()
+        console.set_level(console.quiet)
+        return re.findall(r"^rebuilding (.*?): (.*)$", output.getvalue(), re.MULTILINE)
+
+    def output_mtime(self, relpath):
+        return os.stat(os.path.join(self.public, relpath)).st_mtime_ns
+
+    def test_cold_build_writes_everything(self):
+        manifest = self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "about", "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.css")))
+        self.assertEqual(load_manifest(self.manifest_path), manifest)
+
+    def test_warm_build_only_renders_changed_page(self):
+        self.build()
+        os.utime(os.path.join(self.public, "index.html"), ns=(0, 0))
+        os.utime(os.path.join(self.public, "about", "index.html"), ns=(0, 0))
+
+        self.write("content/about/index.md", "# about\n\nsomething new")
+        self.build()
+
+        self.assertEqual(self.output_mtime("index.html"), 0)
+        self.assertNotEqual(self.output_mtime("about/index.html"), 0)
+        with open(os.path.join(self.public, "about", "index.html")) as f:
+            self.assertIn("something new", f.read())
+
+    def test_renderer_change_rebuilds_every_page(self):
+        manifest = self.build()
+        # as if the last build ran an older textnode.py or block_markdown.py
+        manifest["renderer"] = "older"
+        save_manifest(self.manifest_path, manifest)
+        self.assertEqual(
+            sorted(self.rebuilt_pages()),
+            [
+                (os.path.join(self.content, "about", "index.md"), "renderer changed"),
+                (os.path.join(self.content, "index.md"), "renderer changed"),
+            ],
+        )
+        self.assertNotEqual(load_manifest(self.manifest_path)["renderer"], "older")
+
+    def test_manifest_keeps_page_metadata(self):
+        self.write("content/about/index.md", "# about\n\n## team\n\nsee [home](/)")
+        self.build()
+        self.write("content/index.md", "# home\n\nwelcome back")
+        manifest = self.build()
+
+        index = site_index(manifest)
+        about = index[os.path.join(self.public, "about", "index.html")]
+        self.assertEqual(about["title"], "about")
+        self.assertEqual(about["headings"], [[1, "about"], [2, "team"]])
+        self.assertEqual(about["links"], ["/"])
+        self.assertEqual(index[os.path.join(self.public, "index.html")]["word_count"], 3)
+
+    def test_manifest_keeps_front_matter(self):
+        self.write("content/about/index.md", "---\nauthor: me\n---\n# about")
+        manifest = self.build()
+        self.assertEqual(manifest["pages"][os.path.join(self.content, "about", "index.md")]["front_matter"], {"author": "me"})
+        self.assertEqual(manifest["pages"][os.path.join(self.content, "index.md")]["front_matter"], {})
+
+    def test_unchanged_stat_skips_reading_the_page(self):
+        chooser = TemplateChooser(self.content, self.template)
+        old_entry = {"hash": "abc", "size": 10, "mtime_ns": 5, "front_matter": {}}
+        missing = os.path.join(self.content, "missing", "index.md")
+        entry = plan_page(missing, self.public, chooser, Fingerprints({}), old_entry, (10, 5), 10 ** 10)
+        self.assertEqual(entry["hash"], "abc")
+
+        # written too close to the last build to trust the mtime
+        with self.assertRaises(FileNotFoundError):
+            plan_page(missing, self.public, chooser, Fingerprints({}), old_entry, (10, 5), 10)
+
+    def test_template_change_rerenders_every_page(self):
+        self.build()
+        os.utime(os.path.join(self.public, "index.html"), ns=(0, 0))
+        os.utime(os.path.join(self.public, "about", "index.html"), ns=(0, 0))
+
+        self.write("template.html", "<h1>{{ Title }}</h1>{{ Content }}")
+        self.build()
+
+        self.assertNotEqual(self.output_mtime("index.html"), 0)
+        self.assertNotEqual(self.output_mtime("about/index.html"), 0)
+
+    def test_deleted_sources_remove_outputs(self):
+        self.build()
+        os.remove(os.path.join(self.content, "about", "index.md"))
+        os.remove(os.path.join(self.static, "index.css"))
+        self.build()
+
+        self.assertFalse(os.path.exists(os.path.join(self.public, "about")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.css")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+    def test_missing_output_is_rebuilt(self):
+        self.build()
+        os.remove(os.path.join(self.public, "index.html"))
+        self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+
+    def test_partial_change_rerenders_only_its_pages(self):
+        self.write("partials/nav.html", "<nav>v1</nav>")
+        self.write("post.html", "{{> partials/nav.html }}{{ Content }}")
+        self.write("content/about/index.md", "---\ntemplate: post.html\n---\n# about\n\nall about it")
+        self.build()
+        with open(os.path.join(self.public, "about", "index.html")) as f:
+            self.assertEqual(f.read(), "<nav>v1</nav><div><h1>about</h1><p>all about it</p></div>")
+        os.utime(os.path.join(self.public, "index.html"), ns=(0, 0))
+
+        self.write("partials/nav.html", "<nav>v2</nav>")
+        console.set_level(console.normal)
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.build()
+        self.assertEqual(self.output_mtime("index.html"), 0)
+        with open(os.path.join(self.public, "about", "index.html")) as f:
+            self.assertIn("<nav>v2</nav>", f.read())
+        self.assertIn(f"rebuilding {os.path.join(self.content, 'about', 'index.md')}: ", output.getvalue())
+        self.assertIn("nav.html changed", output.getvalue())
+
+    def test_directory_template(self):
+        self.write("content/blog/post/index.md", "# post\n\nwords")
+        self.build()
+        os.utime(os.path.join(self.public, "index.html"), ns=(0, 0))
+
+        self.write("content/blog/template.html", "<article>{{ Content }}</article>")
+        manifest = self.build()
+        self.assertEqual(self.output_mtime("index.html"), 0)
+        with open(os.path.join(self.public, "blog", "post", "index.html")) as f:
+            self.assertEqual(f.read(), "<article><div><h1>post</h1><p>words</p></div></article>")
+        entry = manifest["pages"][os.path.join(self.content, "blog", "post", "index.md")]
+        self.assertEqual(entry["template"], os.path.join(self.content, "blog", "template.html"))
+
+    def test_static_asset_change_rerenders_pages_using_it(self):
+        self.write("static/report.pdf", "v1")
+        self.write("content/about/index.md", "# about\n\n[the report](/report.pdf)")
+        manifest = self.build()
+        about = manifest["pages"][os.path.join(self.content, "about", "index.md")]
+        self.assertIn(os.path.join(self.static, "report.pdf"), about["deps"])
+
+        self.write("static/report.pdf", "version two")
+        self.assertEqual(
+            self.rebuilt_pages(),
+            [(os.path.join(self.content, "about", "index.md"), f"{os.path.join(self.static, 'report.pdf')} changed")],
+        )
+
+    def test_unchanged_output_keeps_its_mtime(self):
+        self.build(incremental=False)
+        os.utime(os.path.join(self.public, "index.html"), ns=(0, 0))
+        self.build(incremental=False)
+        self.assertEqual(self.output_mtime("index.html"), 0)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.html.tmp")))
+
+    def test_parallel_build_matches_serial(self):
+        for i in range(5):
+            self.write(f"content/post{i}/index.md", f"# post {i}\n\n* item **{i}**\n* [home](/)")
+        self.build(incremental=False)
+        serial = self.read_outputs()
+        self.build(incremental=False, jobs=3)
+        self.assertEqual(self.read_outputs(), serial)
+
+    def test_parallel_build_fills_parent_block_cache(self):
+        for i in range(3):
+            self.write(f"content/post{i}/index.md", f"# post {i}\n\nshared text")
+        block_cache = BlockCache()
+        build_site(
+            self.content, self.template, self.static, self.public, self.manifest_path,
+            jobs=2, block_cache=block_cache,
+        )
+        self.assertIsNotNone(block_cache.get("shared text"))
+        self.assertIsNotNone(block_cache.get("# post 2"))
+
+
+    def test_clean_build_wipes_unknown_files(self):
+        self.build()
+        self.write("public/leftover.txt", "not ours")
+        self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.public, "leftover.txt")))
+        build_site(self.content, self.template, self.static, self.public, self.manifest_path, clean=True)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "leftover.txt")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+
+class TestSyncStatic(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "public")
+        for relpath in ("index.css", "images/pic.png", "images/pic.png:Zone.Identifier"):
+            self.write(f"static/{relpath}", relpath)
+
+    def test_sync_skips_ignored_files(self):
+        entries, copied = sync_static(self.static, self.public)
+        self.assertEqual(copied, 2)
+        self.assertEqual(
+            sorted(os.path.relpath(e["output"], self.public) for e in entries.values()),
+            ["images/pic.png", "index.css"]
+        )
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images", "pic.png:Zone.Identifier")))
+
+    def test_unchanged_files_are_not_copied_again(self):
+        sync_static(self.static, self.public)
+        _, copied = sync_static(self.static, self.public)
+        self.assertEqual(copied, 0)
+
+        with open(os.path.join(self.static, "index.css"), "w") as f:
+            f.write("body { color: red }")
+        _, copied = sync_static(self.static, self.public)
+        self.assertEqual(copied, 1)
+        with open(os.path.join(self.public, "index.css")) as f:
+            self.assertEqual(f.read(), "body { color: red }")
+
+    def test_hardlink_mode(self):
+        sync_static(self.static, self.public, link_mode="hardlink")
+        self.assertTrue(
+            os.path.samefile(
+                os.path.join(self.static, "index.css"),
+                os.path.join(self.public, "index.css"),
+            )
+        )
+
+    def test_reflink_mode_falls_back_to_copy(self):
+        _, copied = sync_static(self.static, self.public, link_mode="reflink")
+        self.assertEqual(copied, 2)
+        with open(os.path.join(self.public, "images", "pic.png")) as f:
+            self.assertEqual(f.read(), "images/pic.png")
+
+    def test_unknown_link_mode(self):
+        with self.assertRaises(ValueError):
+            sync_static(self.static, self.public, link_mode="symlink")
+
+
+class TestManifest(unittest.TestCase):
+    def test_hash_file(self):
+        with tempfile.NamedTemporaryFile("w", delete=False) as f:
+            f.write("some content")
+        try:
+            self.assertEqual(
+                hash_file(f.name),
+                "290f493c44f5d63d06b374d0a5abd292fae38b92cab2fae5efefe1b0e9347f56",
+            )
+        finally:
+            os.remove(f.name)
+
+    def test_load_missing_manifest(self):
+        self.assertEqual(load_manifest("/nonexistent/manifest.json"), empty_manifest())
+
+
+if __name__ == "__main__":
+    unittest.main()
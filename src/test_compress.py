@@ -0,0 +1,96 @@
+import unittest
+import gzip
+import os
+
+from sitetest import SiteTestCase, TempDirTestCase
+from build import build_site
+from compress import compress_site, is_compressible
+
+
+class TestCompressSite(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.public = self.root
+        self.write("index.html", "<h1>home</h1>" * 50)
+        self.write("index.css", "body { margin: 0 }")
+        self.write("images/photo.png", "\x89PNG not really")
+        self.write("downloads/site.tar.gz", "already an archive")
+
+    def test_is_compressible(self):
+        self.assertTrue(is_compressible("index.HTML"))
+        self.assertFalse(is_compressible("photo.png"))
+
+    def test_writes_gzip_siblings_for_text_files(self):
+        siblings, written, up_to_date, orphans = compress_site(self.public, ("gz",))
+        self.assertEqual((written, up_to_date, orphans), (2, 0, 0))
+        self.assertEqual(
+            sorted(siblings),
+            [os.path.join(self.public, "index.css.gz"), os.path.join(self.public, "index.html.gz")],
+        )
+        with gzip.open(os.path.join(self.public, "index.html.gz"), "rt") as f:
+            self.assertEqual(f.read(), "<h1>home</h1>" * 50)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images", "photo.png.gz")))
+
+    def test_rebuild_only_redoes_changed_files(self):
+        compress_site(self.public, ("gz",))
+        self.assertEqual(compress_site(self.public, ("gz",))[1:], (0, 2, 0))
+
+        path = self.write("index.css", "body { margin: 1px }")
+        sibling_stat = os.stat(f"{path}.gz")
+        os.utime(path, ns=(sibling_stat.st_mtime_ns + 1, sibling_stat.st_mtime_ns + 1))
+        self.assertEqual(compress_site(self.public, ("gz",))[1:], (1, 1, 0))
+
+    def test_orphaned_siblings_are_removed(self):
+        previous = compress_site(self.public, ("gz",))[0]
+        self.write("data/table.csv.gz", "not ours")
+        os.remove(os.path.join(self.public, "index.css"))
+        self.assertEqual(compress_site(self.public, ("gz",), previous=previous)[1:], (0, 1, 1))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.css.gz")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "data", "table.csv.gz")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "downloads", "site.tar.gz")))
+
+    def test_static_siblings_are_left_alone(self):
+        static_gz = self.write("index.css.gz", "from static/")
+        siblings = compress_site(self.public, ("gz",), static_outputs=[static_gz])[0]
+        self.assertNotIn(static_gz, siblings)
+        with open(static_gz) as f:
+            self.assertEqual(f.read(), "from static/")
+
+    def test_unknown_format(self):
+        with self.assertRaises(ValueError):
+            compress_site(self.public, ("zstd",))
+
+
+class TestCompressedBuild(SiteTestCase):
+    def build(self, compress=True):
+        return build_site(
+            self.content, self.template, self.static, self.public, self.manifest_path, compress=compress
+        )
+
+    def test_static_gzip_files_survive_compressed_builds(self):
+        self.write("static/data/table.csv.gz", "precompressed by hand")
+        for _ in range(2):
+            manifest = self.build()
+            self.assertTrue(os.path.exists(os.path.join(self.public, "data", "table.csv.gz")))
+        self.assertIn(os.path.join(self.public, "index.html.gz"), manifest["compressed"])
+        self.assertNotIn(os.path.join(self.public, "data", "table.csv.gz"), manifest["compressed"])
+
+    def test_full_rebuild_leaves_unchanged_siblings(self):
+        self.build()
+        page = os.path.join(self.public, "index.html")
+        sibling_mtime = os.stat(page).st_mtime_ns
+        os.utime(f"{page}.gz", ns=(sibling_mtime, sibling_mtime))
+        self.build()
+        self.assertEqual(os.stat(page).st_mtime_ns, sibling_mtime)
+        self.assertEqual(os.stat(f"{page}.gz").st_mtime_ns, sibling_mtime)
+
+    def test_turning_compression_off_removes_siblings(self):
+        self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html.gz")))
+        self.build(compress=False)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.html.gz")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
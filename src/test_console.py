@@ -0,0 +1,29 @@
+import unittest
+import contextlib
+import io
+
+import console
+
+
+class TestConsole(unittest.TestCase):
+    def setUp(self):
+        self.addCleanup(console.set_level, console.level)
+
+    def output(self, level):
+        console.set_level(level)
+        out = io.StringIO()
+        err = io.StringIO()
+        with contextlib.redirect_stdout(out), contextlib.redirect_stderr(err):
+            console.info("summary")
+            console.detail("page")
+            console.warning("broken")
+        return out.getvalue(), err.getvalue()
+
+    def test_levels(self):
+        self.assertEqual(self.output(console.quiet), ("", "broken\n"))
+        self.assertEqual(self.output(console.normal), ("summary\n", "broken\n"))
+        self.assertEqual(self.output(console.verbose), ("summary\npage\n", "broken\n"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+import os
+import tempfile
+import unittest
+
+import frontmatter
+from frontmatter import split_front_matter, read_front_matter
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# title\n\ntext"), ({}, "# title\n\ntext"))
+
+    def test_key_values(self):
+        self.assertEqual(
+            split_front_matter("---\ntemplate: post.html\n# a comment\ntitle: a: b\n---\n# title"),
+            ({"template": "post.html", "title": "a: b"}, "# title")
+        )
+
+    def test_unclosed_front_matter_is_markdown(self):
+        self.assertEqual(split_front_matter("---\nnot: closed"), ({}, "---\nnot: closed"))
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError):
+            split_front_matter("---\njust words\n---\n")
+
+    def test_lists_without_yaml(self):
+        yaml = frontmatter.yaml
+        frontmatter.yaml = None
+        try:
+            self.assertEqual(
+                split_front_matter("---\ntags:\n  - a\n  - b c\nempty:\nmore:\n- d\n---\n"),
+                ({"tags": ["a", "b c"], "empty": "", "more": ["d"]}, ""),
+            )
+            with self.assertRaises(ValueError):
+                split_front_matter("---\ntitle: x\n- a\n---\n")
+        finally:
+            frontmatter.yaml = yaml
+
+    def test_nested_mapping_needs_yaml(self):
+        yaml = frontmatter.yaml
+        frontmatter.yaml = None
+        try:
+            with tempfile.TemporaryDirectory() as dir:
+                path = os.path.join(dir, "index.md")
+                with open(path, "w") as f:
+                    f.write("---\nauthor:\n  name: a\n---\n# x\n")
+                with self.assertRaisesRegex(ValueError, f"^{path}: front matter needs PyYAML"):
+                    read_front_matter(path)
+        finally:
+            frontmatter.yaml = yaml
+
+    @unittest.skipIf(frontmatter.yaml is None, "needs PyYAML")
+    def test_yaml(self):
+        values, body = split_front_matter(
+            "---\ntitle: Post\ndate: 2024-05-01\ntags:\n  - a\n  - b\ndraft: true\n---\n# title"
+        )
+        self.assertEqual(values, {"title": "Post", "date": "2024-05-01", "tags": ["a", "b"], "draft": True})
+        self.assertEqual(body, "# title")
+
+    def test_read_front_matter_stops_at_header(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "index.md")
+            with open(path, "wb") as f:
+                # a body that isn't valid utf-8, well past the header
+                f.write(b"---\ntitle: x\n---\n# x\n" + b"a" * (1 << 20) + b"\xff\xfe")
+            self.assertEqual(read_front_matter(path), {"title": "x"})
+
+    def test_read_front_matter_without_header(self):
+        with tempfile.TemporaryDirectory() as dir:
+            path = os.path.join(dir, "index.md")
+            with open(path, "w") as f:
+                f.write("# x\n")
+            self.assertEqual(read_front_matter(path), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import os
+import tracemalloc
+
+import gencontent
+from sitetest import TempDirTestCase
+from gencontent import generate_page, generate_pages, read_title
+
+
+class TestStreamedPages(TempDirTestCase):
+    markdown = (
+        "---\ntitle: ignored here\n---\n"
+        "# big *page*\n\nsome **bold** text\nover two lines\n\n"
+        "```\ncode\n\nwith a blank line\n```\n\n"
+        "> a quote\n\n- one\n- [two](/two/)\n\n1. first\n2. second\n\n"
+        "![pic](/images/pic.png)\n\n## the end"
+    )
+
+    def setUp(self):
+        super().setUp()
+        self.template = self.write("template.html", "<title>{{ Title }}</title>{{ Content }}<p>{{ WordCount }} words</p>")
+        self.page = self.write("index.md", self.markdown)
+        self.addCleanup(setattr, gencontent, "stream_threshold", gencontent.stream_threshold)
+
+    def render(self, dest, **kwargs):
+        os.makedirs(dest, exist_ok=True)
+        document = generate_page(self.page, self.template, dest, **kwargs)
+        with open(os.path.join(dest, "index.html")) as f:
+            return f.read(), document
+
+    def test_streamed_page_matches_whole_page(self):
+        images = {"/images/pic.png": {"width": 10, "height": 20}}
+        whole, whole_document = self.render(os.path.join(self.root, "whole"), images=images)
+        gencontent.stream_threshold = 0
+        streamed, streamed_document = self.render(os.path.join(self.root, "streamed"), images=images)
+
+        self.assertEqual(streamed, whole)
+        self.assertIn('width="10"', streamed)
+        self.assertEqual(streamed_document.metadata(), whole_document.metadata())
+        self.assertEqual(streamed_document.html, "")
+
+    def test_parallel_build_streams_big_pages(self):
+        gencontent.stream_threshold = 0
+        dest = os.path.join(self.root, "public")
+        documents = generate_pages([(self.page, dest)], self.template, jobs=2)
+        self.assertEqual(documents[self.page].title, "big *page*")
+        self.assertTrue(os.path.exists(os.path.join(dest, "index.html")))
+
+    def test_sizes_from_the_plan_pick_streaming(self):
+        # the size passed in is used as is, the file isn't stat-ed again
+        dest = os.path.join(self.root, "public")
+        documents = generate_pages(
+            [(self.page, dest)], self.template, sizes={self.page: gencontent.stream_threshold + 1}
+        )
+        self.assertEqual(documents[self.page].html, "")
+        self.assertEqual(documents[self.page].title, "big *page*")
+
+    def test_front_matter_fills_template_slots(self):
+        self.write("template.html", "<title>{{ Title }}</title><time>{{ date }}</time>{{ Content }}{{ tags }}")
+        self.write("index.md", "---\ndate: 2024-05-01\nContent: not this\n---\n# post")
+        whole, _ = self.render(os.path.join(self.root, "whole"))
+        self.assertEqual(whole, "<title>post</title><time>2024-05-01</time><div><h1>post</h1></div>")
+
+        gencontent.stream_threshold = 0
+        streamed, _ = self.render(os.path.join(self.root, "streamed"))
+        self.assertEqual(streamed, whole)
+
+    def test_front_matter_title_wins_over_h1(self):
+        self.write("index.md", "---\ntitle: Front Title\n---\n# H1 Title")
+        whole, _ = self.render(os.path.join(self.root, "whole"))
+        self.assertTrue(whole.startswith("<title>Front Title</title>"))
+        gencontent.stream_threshold = 0
+        streamed, _ = self.render(os.path.join(self.root, "streamed"))
+        self.assertEqual(streamed, whole)
+
+    def test_read_title_needs_h1(self):
+        self.write("index.md", "## no title\n\ntext")
+        with self.assertRaises(ValueError):
+            read_title(self.page)
+
+    def test_streaming_memory_is_bounded_by_block(self):
+        # no links, those are kept in the page's metadata
+        block = "- item with some *inline* text and a `code` span\n" * 200
+        self.write("index.md", "# changelog\n\n" + (block + "\n") * 100)
+        size = os.path.getsize(self.page)
+        gencontent.stream_threshold = 0
+
+        tracemalloc.start()
+        try:
+            generate_page(self.page, self.template, self.root)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.assertLess(peak, size / 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,5 @@
 import unittest
+import io
 
 from htmlnode import HTMLNode
 from htmlnode import LeafNode
@@ -95,3 +96,36 @@ class TestHTMLNode(unittest.TestCase):
             parent_node.to_html(),
             "<h1><b>some bold text</b>plain text<i>italic text</i></h1>"
         )
+
+    def test_iter_html_fragments(self):
+        parent_node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode("b", "bold text")]),
+                LeafNode(None, "plain text"),
+            ]
+        )
+        self.assertEqual(
+            list(parent_node.iter_html()),
+            ["<div>", "<p>", "<b>bold text</b>", "</p>", "plain text", "</div>"]
+        )
+
+    def test_write_html(self):
+        parent_node = ParentNode(
+            "div",
+            [
+                ParentNode("p", [LeafNode("a", "link", {"href": "/"})]),
+            ]
+        )
+        out = io.StringIO()
+        parent_node.write_html(out)
+        self.assertEqual(out.getvalue(), parent_node.to_html())
+        self.assertEqual(out.getvalue(), '<div><p><a href="/">link</a></p></div>')
+
+    def test_to_html_no_children_raises(self):
+        with self.assertRaises(ValueError):
+            ParentNode("div").to_html()
+
+    def test_no_instance_dict(self):
+        for node in (HTMLNode(), LeafNode("b", "bold"), ParentNode("p", [])):
+            self.assertFalse(hasattr(node, "__dict__"))
@@ -0,0 +1,140 @@
+import unittest
+import os
+import struct
+import tempfile
+
+from sitetest import SiteTestCase
+from build import build_site
+from images import (
+    Image,
+    read_image_size,
+    add_image_attributes,
+    derivative_path,
+    image_index,
+    process_images,
+)
+from watch import rebuild_changed
+
+
+def png_header(width, height):
+    return b"\x89PNG\r\n\x1a\n" + b"\x00\x00\x00\rIHDR" + struct.pack(">II", width, height) + b"\x08\x02\x00\x00\x00"
+
+def gif_header(width, height):
+    return b"GIF89a" + struct.pack("<HH", width, height) + b"\x00" * 22
+
+def jpeg_header(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x00" * 9
+    sof0 = b"\xff\xc0" + struct.pack(">HBHH", 17, 8, height, width) + b"\x00" * 10
+    return b"\xff\xd8" + app0 + sof0
+
+
+class TestImageSize(unittest.TestCase):
+    def test_read_image_size(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for name, data in (
+                ("a.png", png_header(1344, 896)),
+                ("a.gif", gif_header(40, 30)),
+                ("a.jpg", jpeg_header(800, 600)),
+                ("a.txt", b"not an image"),
+            ):
+                path = os.path.join(tmp, name)
+                with open(path, "wb") as f:
+                    f.write(data)
+                with self.subTest(name):
+                    expected = {"a.png": (1344, 896), "a.gif": (40, 30), "a.jpg": (800, 600)}.get(name)
+                    self.assertEqual(read_image_size(path), expected)
+
+    def test_derivative_path(self):
+        self.assertEqual(derivative_path("public/images/a.png", 480), "public/images/a-480w.png")
+
+    def test_add_image_attributes(self):
+        html = '<p><img src="/a.png" alt="a"></img><img src="/b.png" alt="b"></img></p>'
+        index = {"/a.png": {"width": 10, "height": 5, "srcset": "/a-480w.png 480w, /a.png 10w"}}
+        self.assertEqual(
+            add_image_attributes(html, index),
+            '<p><img src="/a.png" alt="a" width="10" height="5" srcset="/a-480w.png 480w, /a.png 10w"></img>'
+            '<img src="/b.png" alt="b"></img></p>'
+        )
+
+
+class TestImageBuild(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("template.html", "{{ Content }}")
+        self.write("content/index.md", "# home\n\n![pic](/images/pic.png)")
+        self.write("content/about/index.md", "# about\n\nno pictures")
+        self.write("static/images/pic.png", png_header(1344, 896))
+        self.image_cache_dir = os.path.join(self.root, ".ssg-cache", "images")
+
+    def build(self, widths=(480,)):
+        return build_site(
+            self.content,
+            self.template,
+            self.static,
+            self.public,
+            self.manifest_path,
+            incremental=True,
+            images=True,
+            image_widths=widths,
+        )
+
+    def read(self, relpath):
+        with open(os.path.join(self.public, relpath)) as f:
+            return f.read()
+
+    def test_image_dimensions_and_incremental_rebuild(self):
+        self.build()
+        self.assertIn('<img src="/images/pic.png" alt="pic" width="1344" height="896"></img>', self.read("index.html"))
+
+        about_path = os.path.join(self.public, "about", "index.html")
+        os.utime(about_path, ns=(0, 0))
+        self.write("static/images/pic.png", png_header(640, 480))
+        self.build()
+        self.assertIn('width="640" height="480"', self.read("index.html"))
+        # the page without the image wasn't touched
+        self.assertEqual(os.stat(about_path).st_mtime_ns, 0)
+
+    def test_unchanged_images_are_not_processed_again(self):
+        manifest = self.build()
+        images, processed = process_images(
+            manifest["static"], self.public, manifest["images"], self.image_cache_dir, (480,)
+        )
+        self.assertEqual(processed, 0)
+        self.assertEqual(images, manifest["images"])
+
+    def test_watch_rebuild_keeps_image_widths(self):
+        manifest = self.build()
+        self.write("static/images/other.png", png_header(10, 10))
+        rebuild_changed(
+            {os.path.join(self.static, "images", "other.png")},
+            manifest,
+            self.content,
+            self.template,
+            self.static,
+            self.public,
+            images=True,
+            image_cache_dir=self.image_cache_dir,
+            image_widths=(480,),
+        )
+        for entry in manifest["images"].values():
+            self.assertEqual(entry["widths"], [480])
+
+    @unittest.skipIf(Image is None, "resized copies need Pillow")
+    def test_derivatives_and_srcset(self):
+        Image.new("RGB", (1344, 896)).save(os.path.join(self.static, "images", "pic.png"))
+        manifest = self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.public, "images", "pic-480w.png")))
+        self.assertEqual(
+            image_index(manifest["images"])["/images/pic.png"]["srcset"],
+            "/images/pic-480w.png 480w, /images/pic.png 1344w"
+        )
+        self.assertIn('srcset="/images/pic-480w.png 480w', self.read("index.html"))
+
+        # a width change drops the old derivatives
+        self.build(widths=(960,))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "images", "pic-480w.png")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "images", "pic-960w.png")))
+
+
+if __name__ == "__main__":
+    unittest.main()
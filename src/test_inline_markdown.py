@@ -1,4 +1,5 @@
 import unittest
+import inline_markdown
 from inline_markdown import (
     split_nodes_delimiter,
     extract_markdown_images,
@@ -6,6 +7,7 @@ from inline_markdown import (
     split_nodes_image,
     split_nodes_link,
     text_to_textnodes,
+    register_inline_syntax,
 )
 
 from textnode import (
@@ -16,7 +18,12 @@ from textnode import (
     text_type_code,
     text_type_img,
     text_type_link,
+    register_text_type,
+    text_node_to_html,
+    text_node_builders,
+    text_html_builders,
 )
+from htmlnode import LeafNode
 
 class TestSplitNodesDelimiter(unittest.TestCase):
     def test_code_text(self):
@@ -228,6 +235,67 @@ class TestTextToTextNodes(unittest.TestCase):
             ]
         )
 
+    def test_unmatched_delimiter(self):
+        with self.assertRaises(Exception):
+            text_to_textnodes("this **bold never closes")
+
+    def test_matches_chained_split_passes(self):
+        texts = [
+            "",
+            "plain text only",
+            "**bold** at the start and *italic* at the end *x*",
+            "`code` then ![img](a.png)![img2](b.png) back to back",
+            "a [link](/a) a [second](/b) and [third](/c)",
+            "an empty `` code span and a stray [ bracket",
+            "[*not* a link](/x) since delimiters split first",
+            "[unclosed bracket before ![an image](/i.png)",
+            "link then image [l](/l) ![i](/i.png) then **bold**",
+        ]
+        for text in texts:
+            nodes = split_nodes_delimiter([TextNode(text, text_type_text)], "**", text_type_bold)
+            nodes = split_nodes_delimiter(nodes, "*", text_type_italic)
+            nodes = split_nodes_delimiter(nodes, "`", text_type_code)
+            nodes = split_nodes_image(nodes)
+            nodes = split_nodes_link(nodes)
+            self.assertEqual(text_to_textnodes(text), nodes, text)
+
+class TestRegisteredInlineSyntax(unittest.TestCase):
+    def tearDown(self):
+        inline_markdown.registered_inline_syntaxes.clear()
+        inline_markdown.inline_token_pattern = inline_markdown.compile_inline_token_pattern()
+        text_node_builders.pop("strikethrough", None)
+        text_html_builders.pop("strikethrough", None)
+
+    def test_registered_syntax_is_scanned_and_rendered(self):
+        register_text_type("strikethrough", lambda node: LeafNode("s", node.text))
+        register_inline_syntax("strikethrough", r"~~(.+?)~~")
+        nodes = text_to_textnodes("keep ~~drop~~ and **bold** ~~*too*~~")
+        self.assertEqual(
+            nodes,
+            [
+                TextNode("keep ", text_type_text),
+                TextNode("drop", "strikethrough"),
+                TextNode(" and ", text_type_text),
+                TextNode("bold", text_type_bold),
+                TextNode(" ", text_type_text),
+                TextNode("*too*", "strikethrough"),
+            ],
+        )
+        self.assertEqual("".join(map(text_node_to_html, nodes)), "keep <s>drop</s> and <b>bold</b> <s>*too*</s>")
+
+    def test_custom_node_factory(self):
+        register_inline_syntax("link", r"<(https?://[^>]+)>", lambda match: TextNode(match.group(1), text_type_link, match.group(1)))
+        self.assertEqual(
+            text_to_textnodes("see <https://example.com>"),
+            [TextNode("see ", text_type_text), TextNode("https://example.com", text_type_link, "https://example.com")],
+        )
+
+    def test_pattern_needs_a_text_group(self):
+        with self.assertRaises(ValueError):
+            register_inline_syntax("strikethrough", r"~~.+?~~")
+        with self.assertRaises(ValueError):
+            register_inline_syntax("strikethrough", r"~~(?P<text>.+?)~~")
+
 if __name__ =="__main__":
 
     unittest.main()
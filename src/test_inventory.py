@@ -0,0 +1,50 @@
+import unittest
+import os
+
+from sitetest import TempDirTestCase
+from copystatic import discover_static
+from gencontent import discover_pages
+from inventory import Inventory
+
+
+class TestInventory(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        for relpath in ("content/index.md", "content/b/index.md", "content/a/x.md", "static/.DS_Store", "static/css/a.css"):
+            self.write(relpath, relpath)
+
+    def path(self, relpath):
+        return os.path.join(self.root, relpath)
+
+    def test_walk_order_and_stats(self):
+        inventory = Inventory([self.path("content"), self.path("missing")])
+        self.assertEqual(
+            list(inventory.files),
+            [self.path("content/a/x.md"), self.path("content/b/index.md"), self.path("content/index.md")],
+        )
+        stat = os.stat(self.path("content/index.md"))
+        self.assertEqual(inventory.stat(self.path("content/index.md")), (stat.st_size, stat.st_mtime_ns))
+        self.assertIsNone(inventory.stat(self.path("content/nope.md")))
+
+    def test_files_under(self):
+        inventory = Inventory([self.path("content"), self.path("static")])
+        self.assertEqual(inventory.files_under(self.path("content/a")), [self.path("content/a/x.md")])
+        self.assertEqual(len(inventory.files_under(self.root)), 5)
+
+    def test_discovery_reads_the_inventory(self):
+        inventory = Inventory([self.path("content"), self.path("static")])
+        self.assertEqual(
+            discover_pages(self.path("content"), self.path("public"), inventory),
+            [
+                (self.path("content/b/index.md"), self.path("public/b")),
+                (self.path("content/index.md"), self.path("public")),
+            ],
+        )
+        self.assertEqual(
+            discover_static(self.path("static"), self.path("public"), inventory=inventory),
+            [(self.path("static/css/a.css"), self.path("public/css/a.css"))],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import unittest
+import json
+import os
+
+from sitetest import SiteTestCase
+from build import build_site
+from linkcheck import check_links, output_url, is_external
+
+
+class TestLinkCheck(unittest.TestCase):
+    def test_output_url(self):
+        self.assertEqual(output_url("public/index.html", "public"), "/")
+        self.assertEqual(output_url("public/blog/post/index.html", "public"), "/blog/post/")
+        self.assertEqual(output_url("public/images/a.png", "public"), "/images/a.png")
+
+    def test_is_external(self):
+        self.assertTrue(is_external("https://boot.dev"))
+        self.assertTrue(is_external("mailto:someone@example.com"))
+        self.assertTrue(is_external("//cdn.example.com/x.js"))
+        self.assertFalse(is_external("/images/a.png"))
+        self.assertFalse(is_external("../other"))
+
+    def test_check_links(self):
+        manifest = {
+            "pages": {
+                "content/index.md": {
+                    "output": "public/index.html",
+                    "metadata": {"links": ["/blog", "/blog/", "/missing", "https://x.com", "#top"], "images": ["/a.png"]},
+                },
+                "content/blog/index.md": {
+                    "output": "public/blog/index.html",
+                    "metadata": {"links": ["../", "post/", "post%20two/"], "images": ["../b.png"]},
+                },
+                "content/blog/post/index.md": {
+                    "output": "public/blog/post/index.html",
+                    "metadata": {"links": [], "images": []},
+                },
+            },
+            "static": {"static/a.png": {"output": "public/a.png"}},
+        }
+        report = check_links(manifest, "public")
+        self.assertEqual(report["pages"], 3)
+        self.assertEqual(report["external"], 1)
+        self.assertEqual(report["checked"], 9)
+        self.assertEqual(
+            [(link["page"], link["url"]) for link in report["broken"]],
+            [("/", "/missing"), ("/blog/", "post%20two/"), ("/blog/", "../b.png")]
+        )
+        self.assertEqual(report["index"]["/blog/"]["images"], ["../b.png"])
+
+
+class TestLinkReport(SiteTestCase):
+    def test_build_writes_report(self):
+        self.write("content/index.md", "# home\n\n[about](/about) and [gone](/gone)")
+        self.write("content/about/index.md", "# about\n\n[home](/)")
+        report_path = os.path.join(self.root, "links.json")
+        build_site(
+            self.content, self.template, self.static, self.public, self.manifest_path, link_report=report_path
+        )
+        with open(report_path) as f:
+            report = json.load(f)
+        self.assertEqual(report["broken"], [{"page": "/", "kind": "link", "url": "/gone", "resolved": "/gone"}])
+        self.assertEqual(self.warnings.getvalue(), "broken link on /: /gone\n")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import os
+
+from sitetest import SiteTestCase
+from build import build_site
+from listings import write_listings, page_date
+
+
+class TestListings(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.write("content/blog/one/index.md", "---\ndate: 2024-01-01\n---\n# one")
+        self.write("content/blog/two/index.md", "---\ndate: 2024-03-01\ntitle: Two & more\n---\n# two")
+        self.write("content/blog/three/index.md", "---\ndate: 2024-02-01T12:30:00+02:00\n---\n# three")
+
+    def read(self, relpath):
+        with open(os.path.join(self.public, relpath)) as f:
+            return f.read()
+
+    def build(self, **kwargs):
+        return build_site(
+            self.content,
+            self.template,
+            self.static,
+            self.public,
+            self.manifest_path,
+            incremental=True,
+            **kwargs,
+        )
+
+    def test_sitemap(self):
+        self.build(site_url="https://example.com/", section_indexes=True)
+        sitemap = self.read("sitemap.xml")
+        self.assertIn("<url><loc>https://example.com/</loc></url>", sitemap)
+        self.assertIn(
+            "<url><loc>https://example.com/blog/one/</loc><lastmod>2024-01-01T00:00:00+00:00</lastmod></url>",
+            sitemap,
+        )
+        self.assertIn("<url><loc>https://example.com/blog/</loc></url>", sitemap)
+        self.assertTrue(sitemap.endswith("</urlset>\n"))
+
+    def test_feed_keeps_newest(self):
+        self.build(site_url="https://example.com", feed_size=2)
+        feed = self.read("feed.xml")
+        self.assertIn("<title>home</title>", feed)
+        self.assertIn("<updated>2024-03-01T00:00:00+00:00</updated>", feed)
+        self.assertNotIn("blog/one/", feed)
+        self.assertLess(feed.index("Two &amp; more"), feed.index("<title>three</title>"))
+
+    def test_feed_author(self):
+        self.build(site_url="https://example.com")
+        self.assertIn("<author><name>home</name></author>", self.read("feed.xml"))
+        self.build(site_url="https://example.com", feed_author="A & B")
+        self.assertIn("<author><name>A &amp; B</name></author>", self.read("feed.xml"))
+
+    def test_section_index(self):
+        self.build(section_indexes=True)
+        self.assertEqual(
+            self.read("blog/index.html"),
+            '<title>blog</title><div><h1>blog</h1><ul>'
+            '<li><a href="/blog/one/">one</a></li>'
+            '<li><a href="/blog/three/">three</a></li>'
+            '<li><a href="/blog/two/">Two &amp; more</a></li></ul></div>',
+        )
+
+        # a real index.md takes over from the generated one
+        self.write("content/blog/index.md", "# the blog")
+        manifest = self.build(section_indexes=True)
+        self.assertIn("<h1>the blog</h1>", self.read("blog/index.html"))
+        self.assertEqual(manifest["generated"], [])
+
+    def test_listings_removed_when_turned_off(self):
+        self.build(site_url="https://example.com", section_indexes=True)
+        self.build()
+        self.assertFalse(os.path.exists(os.path.join(self.public, "sitemap.xml")))
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "index.html")))
+        self.assertTrue(os.path.exists(os.path.join(self.public, "blog", "one", "index.html")))
+
+    def test_unchanged_listings_are_not_rewritten(self):
+        manifest = self.build(site_url="https://example.com", section_indexes=True)
+        for output in manifest["generated"]:
+            os.utime(output, ns=(0, 0))
+        outputs, written = write_listings(
+            manifest, self.content, self.template, self.public, "https://example.com", section_indexes=True
+        )
+        self.assertEqual(written, 0)
+        self.assertEqual(len(outputs), 3)
+        for output in outputs:
+            self.assertEqual(os.stat(output).st_mtime_ns, 0)
+
+    def test_invalid_date(self):
+        with self.assertRaises(ValueError):
+            page_date("content/index.md", {"date": "last tuesday"})
+        self.assertIsNone(page_date("content/index.md", {}))
+
+
+if __name__ == "__main__":
+    unittest.main()
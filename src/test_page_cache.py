@@ -0,0 +1,64 @@
+import unittest
+import os
+
+from sitetest import SiteTestCase
+from build import build_site
+from document import Document
+from page_cache import PageCache
+
+
+class TestPageCache(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cache_dir = os.path.join(self.root, ".ssg-cache", "pages")
+
+    def test_get_put_and_counters(self):
+        cache = PageCache(self.cache_dir)
+        self.assertIsNone(cache.get("# home"))
+        document = Document("<div><h1>home</h1></div>", [(1, "home")], 1, ["/about"], front_matter={"date": "2024-01-01"})
+        cache.put("# home", document)
+        self.assertEqual(cache.get("# home"), document)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        # a second cache over the same dir, like the next build, sees the entry
+        self.assertEqual(PageCache(self.cache_dir).get("# home").title, "home")
+
+    def test_other_renderer_versions_are_pruned(self):
+        stale_dir = os.path.join(self.cache_dir, "0123456789abcdef")
+        self.write(os.path.join(stale_dir, "entry.json"), '{"title": "old", "html": "old"}')
+        cache = PageCache(self.cache_dir)
+        cache.put("# home", Document("<h1>home</h1>", [(1, "home")]))
+        self.assertEqual(cache.prune(), 1)
+        self.assertEqual(os.listdir(self.cache_dir), [cache.version])
+
+    def test_prune_evicts_least_recently_used(self):
+        cache = PageCache(self.cache_dir, max_bytes=0)
+        cache.put("a", Document("x" * 100))
+        cache.put("b", Document("x" * 100))
+        os.utime(cache.entry_path("a"), ns=(1, 1))
+        entry_size = os.path.getsize(cache.entry_path("b"))
+        cache.max_bytes = entry_size
+        self.assertEqual(cache.prune(), 1)
+        self.assertIsNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("b"))
+
+    def test_build_reuses_cached_pages(self):
+        outputs = []
+        for jobs in (1, 1, 2):
+            cache = PageCache(self.cache_dir)
+            build_site(
+                self.content, self.template, self.static, self.public, self.manifest_path, jobs=jobs, page_cache=cache
+            )
+            with open(os.path.join(self.public, "about", "index.html")) as f:
+                outputs.append(f.read())
+            outputs.append((cache.hits, cache.misses))
+
+        self.assertEqual(outputs[0], "<title>about</title><div><h1>about</h1><p>all about it</p></div>")
+        self.assertEqual(outputs[1], (0, 2))
+        self.assertEqual(outputs[2], outputs[0])
+        self.assertEqual(outputs[3], (2, 0))
+        self.assertEqual(outputs[4], outputs[0])
+        self.assertEqual(outputs[5], (2, 0))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import json
+import os
+import tempfile
+
+import block_markdown
+from gencontent import generate_page
+from profiler import BuildProfiler, start_profiling, stop_profiling
+
+
+class TestBuildProfiler(unittest.TestCase):
+    def test_nested_stages_are_exclusive(self):
+        profiler = BuildProfiler()
+        with profiler.stage("outer"):
+            with profiler.stage("inner"):
+                pass
+            with profiler.stage("inner"):
+                pass
+        self.assertEqual(profiler.stages["inner"][1], 2)
+        self.assertEqual(profiler.stages["outer"][1], 1)
+        total = sum(seconds for seconds, _ in profiler.stages.values())
+        self.assertLessEqual(total, profiler.report()["total_seconds"])
+
+    def test_profiled_page_build(self):
+        original = block_markdown.text_to_textnodes
+        with tempfile.TemporaryDirectory() as tmp:
+            md_path = os.path.join(tmp, "index.md")
+            template_path = os.path.join(tmp, "template.html")
+            with open(md_path, "w") as f:
+                f.write("# title\n\nsome **bold** text\n\n* a\n* b")
+            with open(template_path, "w") as f:
+                f.write("<title>{{ Title }}</title>{{ Content }}")
+
+            start_profiling()
+            try:
+                generate_page(md_path, template_path, tmp)
+            finally:
+                profiler = stop_profiling()
+
+            with open(os.path.join(tmp, "index.html")) as f:
+                self.assertEqual(
+                    f.read(),
+                    "<title>title</title><div><h1>title</h1><p>some <b>bold</b> text</p><ul><li>a</li><li>b</li></ul></div>"
+                )
+            report_path = os.path.join(tmp, "profile.json")
+            profiler.write_json(report_path)
+            with open(report_path) as f:
+                report = json.load(f)
+
+        self.assertIs(block_markdown.text_to_textnodes, original)
+        for stage in ("read", "render", "scan_blocks", "inline", "template load", "template", "write"):
+            self.assertIn(stage, report["stages"])
+        self.assertEqual(report["stages"]["scan_blocks"]["calls"], 1)
+        # filling the template in, apart from loading it and the write
+        self.assertEqual(report["stages"]["template load"]["calls"], 1)
+        self.assertEqual(report["stages"]["template"]["calls"], 1)
+        self.assertEqual(report["stages"]["write"]["calls"], 1)
+        self.assertEqual(list(report["pages"]), [md_path])
+        self.assertIn(md_path, profiler.format_table())
+
+
+if __name__ == "__main__":
+    unittest.main()
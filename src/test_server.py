@@ -0,0 +1,121 @@
+import unittest
+import functools
+import http.client
+import os
+import sys
+import threading
+from email.utils import formatdate
+
+# server.py sits next to src/, not in it
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from server import CachingHTTPRequestHandler, FileCache
+from sitetest import TempDirTestCase
+from http.server import ThreadingHTTPServer
+
+
+class QuietHandler(CachingHTTPRequestHandler):
+    file_cache = FileCache()
+
+    def log_message(self, format, *args):
+        pass
+
+
+class TestFileCache(TempDirTestCase):
+    def test_eviction_by_size(self):
+        cache = FileCache(max_bytes=10)
+        a = self.write("a", b"aaaaaa")
+        b = self.write("b", b"bbbbbb")
+        cache.get(a, os.stat(a))
+        cache.get(b, os.stat(b))
+        self.assertEqual(list(cache.entries), [b])
+        self.assertEqual(cache.total_bytes, 6)
+
+        # too big for the cache, served but not kept
+        big = self.write("big", b"x" * 20)
+        self.assertEqual(cache.get(big, os.stat(big)), b"x" * 20)
+        self.assertNotIn(big, cache.entries)
+
+    def test_changed_mtime_invalidates(self):
+        cache = FileCache()
+        a = self.write("a", b"old")
+        self.assertEqual(cache.get(a, os.stat(a)), b"old")
+        self.write("a", b"new")
+        os.utime(a, ns=(1, 1))
+        self.assertEqual(cache.get(a, os.stat(a)), b"new")
+        self.assertEqual(cache.total_bytes, 3)
+
+
+class TestCachingServer(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        QuietHandler.file_cache = FileCache()
+        handler = functools.partial(QuietHandler, directory=self.root)
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+
+        self.write("index.html", b"<h1>home</h1>", mtime=1_000_000_000)
+        self.write("index.html.gz", b"gzipped", mtime=1_000_000_001)
+        self.write("index.html.br", b"brotli", mtime=1_000_000_001)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.thread.join()
+
+    def write(self, name, data, mtime):
+        os.utime(super().write(name, data), (mtime, mtime))
+
+    def get(self, path, **headers):
+        connection = http.client.HTTPConnection("127.0.0.1", self.server.server_address[1])
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            return response, response.read()
+        finally:
+            connection.close()
+
+    def test_plain_response(self):
+        response, body = self.get("/")
+        self.assertEqual(response.status, 200)
+        self.assertEqual(body, b"<h1>home</h1>")
+        self.assertIsNone(response.getheader("Content-Encoding"))
+
+    def test_accept_encoding_q_values(self):
+        response, body = self.get("/index.html", **{"Accept-Encoding": "gzip, br"})
+        self.assertEqual((response.getheader("Content-Encoding"), body), ("br", b"brotli"))
+
+        response, body = self.get("/index.html", **{"Accept-Encoding": "br;q=0, gzip;q=0.5"})
+        self.assertEqual((response.getheader("Content-Encoding"), body), ("gzip", b"gzipped"))
+
+        response, body = self.get("/index.html", **{"Accept-Encoding": "gzip;q=0, br;q=bad"})
+        self.assertIsNone(response.getheader("Content-Encoding"))
+        self.assertEqual(body, b"<h1>home</h1>")
+
+    def test_stale_sibling_is_not_served(self):
+        self.write("index.html.br", b"old brotli", mtime=999_999_999)
+        response, body = self.get("/index.html", **{"Accept-Encoding": "br, gzip"})
+        self.assertEqual((response.getheader("Content-Encoding"), body), ("gzip", b"gzipped"))
+
+    def test_if_none_match(self):
+        response, _ = self.get("/index.html")
+        etag = response.getheader("ETag")
+        response, body = self.get("/index.html", **{"If-None-Match": etag})
+        self.assertEqual((response.status, body), (304, b""))
+
+        response, _ = self.get("/index.html", **{"If-None-Match": '"other"'})
+        self.assertEqual(response.status, 200)
+
+    def test_if_modified_since(self):
+        response, body = self.get("/index.html", **{"If-Modified-Since": formatdate(1_000_000_000, usegmt=True)})
+        self.assertEqual((response.status, body), (304, b""))
+
+        response, _ = self.get("/index.html", **{"If-Modified-Since": formatdate(999_999_000, usegmt=True)})
+        self.assertEqual(response.status, 200)
+
+        response, _ = self.get("/index.html", **{"If-Modified-Since": "not a date"})
+        self.assertEqual(response.status, 200)
+
+
+if __name__ == "__main__":
+    unittest.main()
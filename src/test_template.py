@@ -0,0 +1,95 @@
+import unittest
+import io
+import os
+import tempfile
+
+from template import Template, compile_template, load_template
+from htmlnode import LeafNode, ParentNode
+
+
+class TestTemplate(unittest.TestCase):
+    def test_chunks_and_slots(self):
+        template = compile_template("<title>{{ Title }}</title><body>{{Content}}</body>")
+        self.assertEqual(
+            template.chunks,
+            ["<title>", "Title", "</title><body>", "Content", "</body>"]
+        )
+        self.assertEqual(template.slots, ["Title", "Content"])
+
+    def test_render(self):
+        template = Template("<h1>{{ Title }}</h1>{{ Content }}<p>{{ Date }}</p>")
+        self.assertEqual(
+            template.render({"Title": "hi", "Content": "<p>body</p>", "Date": "2024-01-01"}),
+            "<h1>hi</h1><p>body</p><p>2024-01-01</p>"
+        )
+
+    def test_render_missing_slot(self):
+        template = Template("<nav>{{ Nav }}</nav>{{ Title }}")
+        self.assertEqual(template.render({"Title": "hi"}), "<nav></nav>hi")
+
+    def test_render_repeated_slot(self):
+        template = Template("{{ Title }} | {{ Title }}")
+        self.assertEqual(template.render({"Title": "hi"}), "hi | hi")
+
+    def test_write_streams_html_nodes(self):
+        template = Template("<article>{{ Content }}</article>")
+        node = ParentNode("div", [LeafNode("b", "bold")])
+        out = io.StringIO()
+        template.write(out, {"Content": node})
+        self.assertEqual(out.getvalue(), "<article><div><b>bold</b></div></article>")
+
+    def test_render_function_values(self):
+        template = Template("<article>{{ Content }}</article>{{ Content }}")
+        content = lambda: iter(["<p>", "streamed", "</p>"])
+        self.assertEqual(
+            template.render({"Content": content}),
+            "<article><p>streamed</p></article><p>streamed</p>"
+        )
+
+    def test_load_template_is_cached(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write("{{ Title }}")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+
+            with open(path, "w") as f:
+                f.write("<b>{{ Title }}</b>")
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(load_template(path).render({"Title": "x"}), "<b>x</b>")
+
+    def test_partials(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.makedirs(os.path.join(tmp, "partials"))
+            path = os.path.join(tmp, "template.html")
+            with open(path, "w") as f:
+                f.write("{{> partials/head.html }}{{ Content }}")
+            with open(os.path.join(tmp, "partials", "head.html"), "w") as f:
+                f.write("<title>{{ Title }}</title>{{> nav.html }}")
+            with open(os.path.join(tmp, "partials", "nav.html"), "w") as f:
+                f.write("<nav></nav>")
+            template = load_template(path)
+            self.assertEqual(template.render({"Title": "t", "Content": "c"}), "<title>t</title><nav></nav>c")
+            self.assertEqual(
+                template.dependencies,
+                [path, os.path.join(tmp, "partials", "head.html"), os.path.join(tmp, "partials", "nav.html")]
+            )
+
+            # editing a partial is enough to get a fresh template
+            with open(os.path.join(tmp, "partials", "nav.html"), "w") as f:
+                f.write("<nav>new</nav>")
+            os.utime(os.path.join(tmp, "partials", "nav.html"), ns=(0, 0))
+            self.assertIn("<nav>new</nav>", load_template(path).render({}))
+
+    def test_recursive_partial(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "loop.html")
+            with open(path, "w") as f:
+                f.write("{{> loop.html }}")
+            with self.assertRaises(ValueError):
+                load_template(path)
+
+
+if __name__ == "__main__":
+    unittest.main()
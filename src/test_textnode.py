@@ -39,6 +39,10 @@ class TestTextNode(unittest.TestCase):
         self.assertIsNone(node.url)
         self.assertEqual(repr(node), f"TextNode({node.text}, {node.text_type}, None)")
 
+    def test_no_instance_dict(self):
+        node = TextNode("This is a text node", "bold")
+        self.assertFalse(hasattr(node, "__dict__"))
+
 class TestTextToHTML(unittest.TestCase):
     def test_raw_text(self):
         text_node = TextNode("raw text", "text")
@@ -75,6 +79,21 @@ class TestTextToHTML(unittest.TestCase):
             LeafNode("a", "google", {"href": "https://www.google.com"}).to_html()
         )
 
+    def test_direct_html_matches_leaf_nodes(self):
+        text_nodes = [
+            TextNode("raw text", "text"),
+            TextNode("bold text", "bold"),
+            TextNode("italic text", "italic"),
+            TextNode("code text", "code"),
+            TextNode("google", "link", "https://www.google.com"),
+            TextNode("img tag", "image", "https://imgur.com/img123"),
+        ]
+        for text_node in text_nodes:
+            self.assertEqual(
+                text_node_to_html(text_node),
+                text_node_to_html_node(text_node).to_html()
+            )
+
     def test_img_tag(self):
         text_node = TextNode("img tag", "image", "https://imgur.com/img123")
         self.assertEqual(
@@ -82,5 +101,19 @@ class TestTextToHTML(unittest.TestCase):
             LeafNode("img", "", {"src": "https://imgur.com/img123", "alt": "img tag"}).to_html()
         )
 
+    def test_invalid_text_type(self):
+        with self.assertRaises(Exception):
+            text_node_to_html(TextNode("nope", "strikethrough"))
+
+    def test_register_text_type(self):
+        register_text_type("strikethrough", lambda node: LeafNode("s", node.text))
+        try:
+            text_node = TextNode("gone", "strikethrough")
+            self.assertEqual(text_node_to_html_node(text_node).to_html(), "<s>gone</s>")
+            self.assertEqual(text_node_to_html(text_node), "<s>gone</s>")
+        finally:
+            del text_node_builders["strikethrough"]
+            del text_html_builders["strikethrough"]
+
 if __name__ == "__main__":
     unittest.main()
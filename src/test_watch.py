@@ -0,0 +1,125 @@
+import unittest
+import gzip
+import json
+import os
+
+from sitetest import SiteTestCase
+from build import build_site
+from watch import snapshot_tree, diff_snapshots, rebuild_changed, watch_paths
+
+
+class TestWatch(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest = build_site(
+            self.content, self.template, self.static, self.public, self.manifest_path
+        )
+
+    def read(self, relpath):
+        with open(os.path.join(self.root, relpath)) as f:
+            return f.read()
+
+    def rebuild(self, *relpaths):
+        changed = {os.path.join(self.root, relpath) for relpath in relpaths}
+        return rebuild_changed(
+            changed, self.manifest, self.content, self.template, self.static, self.public
+        )
+
+    def test_diff_snapshots(self):
+        paths = [self.content, self.template]
+        before = snapshot_tree(paths)
+        self.write("content/about/index.md", "# about\n\nedited a bit more")
+        self.write("content/new/index.md", "# new")
+        os.remove(os.path.join(self.content, "index.md"))
+        self.assertEqual(
+            diff_snapshots(before, snapshot_tree(paths)),
+            {
+                os.path.join(self.content, "about", "index.md"),
+                os.path.join(self.content, "new", "index.md"),
+                os.path.join(self.content, "index.md"),
+            }
+        )
+
+    def test_markdown_edit_rebuilds_one_page(self):
+        self.write("content/about/index.md", "# about\n\nsomething new")
+        rendered, copied = self.rebuild("content/about/index.md")
+        self.assertEqual((rendered, copied), (1, 0))
+        self.assertIn("something new", self.read("public/about/index.html"))
+
+    def test_new_page_updates_sitemap(self):
+        self.write("content/blog/post/index.md", "# post")
+        rebuild_changed(
+            {os.path.join(self.content, "blog", "post", "index.md")},
+            self.manifest, self.content, self.template, self.static, self.public,
+            site_url="https://example.com", section_indexes=True,
+        )
+        self.assertIn("https://example.com/blog/post/", self.read("public/sitemap.xml"))
+        self.assertIn('<a href="/blog/post/">post</a>', self.read("public/blog/index.html"))
+
+    def test_rebuild_recompresses_and_rechecks_links(self):
+        build_site(self.content, self.template, self.static, self.public, self.manifest_path, compress=True)
+        self.write("content/about/index.md", "# about\n\n[gone](/gone/)")
+        report_path = os.path.join(self.root, "links.json")
+        rebuild_changed(
+            {os.path.join(self.content, "about", "index.md")},
+            self.manifest, self.content, self.template, self.static, self.public,
+            compress=True, link_report=report_path,
+        )
+        with gzip.open(os.path.join(self.public, "about", "index.html.gz"), "rt") as f:
+            self.assertIn("/gone/", f.read())
+        with open(report_path) as f:
+            self.assertEqual([link["url"] for link in json.load(f)["broken"]], ["/gone/"])
+
+    def test_template_edit_rebuilds_every_page(self):
+        self.write("template.html", "<h1>{{ Title }}</h1>{{ Content }}")
+        rendered, _ = self.rebuild("template.html")
+        self.assertEqual(rendered, 2)
+        self.assertTrue(self.read("public/index.html").startswith("<h1>home</h1>"))
+        self.assertTrue(self.read("public/about/index.html").startswith("<h1>about</h1>"))
+
+    def test_new_directory_template_rebuilds_pages_below_it(self):
+        self.write("content/about/template.html", "<main>{{ Content }}</main>")
+        rendered, _ = self.rebuild("content/about/template.html")
+        self.assertEqual(rendered, 1)
+        self.assertEqual(self.read("public/about/index.html"), "<main><div><h1>about</h1><p>all about it</p></div></main>")
+
+        self.write("content/about/template.html", "<section>{{ Content }}</section>")
+        rendered, _ = self.rebuild("content/about/template.html")
+        self.assertEqual(rendered, 1)
+        self.assertTrue(self.read("public/about/index.html").startswith("<section>"))
+
+    def test_partial_outside_watched_dirs(self):
+        self.write("partials/nav.html", "<nav>v1</nav>")
+        self.write("layouts/post.html", "{{> ../partials/nav.html }}{{ Content }}")
+        self.write("content/about/index.md", "---\ntemplate: layouts/post.html\n---\n# about")
+        self.rebuild("content/about/index.md")
+
+        paths = watch_paths(self.manifest, self.content, self.static, self.template)
+        self.assertIn(os.path.join(self.root, "layouts", "post.html"), paths)
+        self.assertIn(os.path.join(self.root, "partials", "nav.html"), paths)
+
+        before = snapshot_tree(paths)
+        self.write("partials/nav.html", "<nav>v2</nav>")
+        changed = diff_snapshots(before, snapshot_tree(paths))
+        self.assertEqual(changed, {os.path.join(self.root, "partials", "nav.html")})
+        rendered, _ = self.rebuild("partials/nav.html")
+        self.assertEqual(rendered, 1)
+        self.assertTrue(self.read("public/about/index.html").startswith("<nav>v2</nav>"))
+
+    def test_deleted_page_removes_output(self):
+        os.remove(os.path.join(self.content, "about", "index.md"))
+        self.rebuild("content/about/index.md")
+        self.assertFalse(os.path.exists(os.path.join(self.public, "about")))
+        self.assertNotIn(os.path.join(self.content, "about", "index.md"), self.manifest["pages"])
+
+    def test_static_changes_are_synced(self):
+        self.write("static/app.js", "let x = 1")
+        os.remove(os.path.join(self.static, "index.css"))
+        _, copied = self.rebuild("static/app.js", "static/index.css")
+        self.assertEqual(copied, 1)
+        self.assertEqual(self.read("public/app.js"), "let x = 1")
+        self.assertFalse(os.path.exists(os.path.join(self.public, "index.css")))
+
+
+if __name__ == "__main__":
+    unittest.main()
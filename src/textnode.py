@@ -8,6 +8,7 @@ text_type_link = "link"
 text_type_img = "image"
 
 class TextNode:
+    __slots__ = ("text", "text_type", "url")
 
     def __init__(self, text, text_type, url=None):
         self.text = text
@@ -24,21 +25,51 @@ class TextNode:
     def __repr__(self):
         return f"TextNode({self.text}, {self.text_type}, {self.url})"
 
+# text type -> function building a LeafNode / function returning the html
+# string, see register_text_type. plain text is most of every document so it
+# skips the lookup
+text_node_builders = {
+    text_type_bold: lambda node: LeafNode("b", node.text),
+    text_type_italic: lambda node: LeafNode("i", node.text),
+    text_type_code: lambda node: LeafNode("code", node.text),
+    text_type_link: lambda node: LeafNode("a", node.text, {"href": node.url}),
+    text_type_img: lambda node: LeafNode("img", "", {"src": node.url, "alt": node.text}),
+}
+text_html_builders = {
+    text_type_bold: lambda node: f"<b>{node.text}</b>",
+    text_type_italic: lambda node: f"<i>{node.text}</i>",
+    text_type_code: lambda node: f"<code>{node.text}</code>",
+    text_type_link: lambda node: f"<a href=\"{node.url}\">{node.text}</a>",
+    text_type_img: lambda node: f"<img src=\"{node.url}\" alt=\"{node.text}\"></img>",
+}
+
+def register_text_type(text_type, to_html_node, to_html=None):
+    # to_html defaults to to_html_node(text_node).to_html(). this only renders
+    # the type, inline_markdown.register_inline_syntax makes markdown produce it
+    if text_type == text_type_text:
+        raise ValueError("plain text can't be re-registered")
+    if to_html is None:
+        to_html = lambda text_node: to_html_node(text_node).to_html()
+    text_node_builders[text_type] = to_html_node
+    text_html_builders[text_type] = to_html
+
 def text_node_to_html_node(text_node):
     if text_node.text_type == text_type_text:
         return LeafNode(None, text_node.text)
-    if text_node.text_type == text_type_bold:
-        return LeafNode("b", text_node.text)
-    if text_node.text_type == text_type_italic:
-        return LeafNode("i", text_node.text)
-    if text_node.text_type == text_type_code:
-        return LeafNode("code", text_node.text)
-    if text_node.text_type == text_type_link:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
-    if text_node.text_type == text_type_img:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
+    builder = text_node_builders.get(text_node.text_type)
+    if builder is None:
+        raise Exception(f"{text_node.text_type} is not a valid text type")
+    return builder(text_node)
 
-    raise Exception(f"{text_node.text_type} is not a valid text type")
+def text_node_to_html(text_node):
+    # same string as text_node_to_html_node(text_node).to_html(), without the
+    # LeafNode in between
+    if text_node.text_type == text_type_text:
+        return text_node.text
+    builder = text_html_builders.get(text_node.text_type)
+    if builder is None:
+        raise Exception(f"{text_node.text_type} is not a valid text type")
+    return builder(text_node)
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
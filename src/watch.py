@@ -0,0 +1,263 @@
+from build import build_site, remove_stale_outputs, prune_empty_dirs, plan_page, render_pages, compress_outputs, report_links
+from copystatic import sync_static, default_static_ignore
+from depgraph import TemplateChooser, Fingerprints, directory_template_name
+from images import process_images, changed_image_urls, default_image_widths
+from inventory import Inventory
+from listings import write_listings, default_feed_size
+from manifest import save_manifest
+import console, os, time
+
+
+def snapshot_tree(paths):
+    # path -> (size, mtime_ns) for every file under paths (files or dirs),
+    # one scandir walk
+    return Inventory(paths).files
+
+def diff_snapshots(old, new):
+    changed = set()
+    for path, signature in new.items():
+        if old.get(path) != signature:
+            changed.add(path)
+    for path in old:
+        if path not in new:
+            changed.add(path)
+    return changed
+
+def wait_for_changes(paths, snapshot, interval=0.2, debounce=0.1):
+    # blocks until something under paths changes, then keeps polling until the
+    # tree has been quiet for debounce seconds so an editor's save burst (or a
+    # git checkout) turns into one rebuild. returns (changed paths, snapshot)
+    while True:
+        time.sleep(interval)
+        current = snapshot_tree(paths)
+        if current == snapshot:
+            continue
+        while True:
+            time.sleep(debounce)
+            settled = snapshot_tree(paths)
+            if settled == current:
+                break
+            current = settled
+        changed = diff_snapshots(snapshot, current)
+        if changed:
+            return changed, current
+        snapshot = current
+
+def watch_paths(manifest, content_dir, static_dir, template_path):
+    # content/, static/ and the default template, plus every template and
+    # partial a page was built from. those can live anywhere (a front matter
+    # template: or {{> partials/nav.html }} usually points outside content/)
+    paths = [content_dir, static_dir, template_path]
+    seen = set(paths)
+    for entry in manifest["pages"].values():
+        for dep in entry.get("deps", {}):
+            if dep in seen or is_under(dep, content_dir) or is_under(dep, static_dir):
+                continue
+            seen.add(dep)
+            paths.append(dep)
+    return paths
+
+def is_under(path, dir):
+    return os.path.commonpath([os.path.abspath(path), os.path.abspath(dir)]) == os.path.abspath(dir)
+
+def rebuild_changed(
+    changed,
+    manifest,
+    content_dir,
+    template_path,
+    static_dir,
+    dest_dir,
+    static_ignore=default_static_ignore,
+    link_mode="copy",
+    block_cache=None,
+    page_cache=None,
+    images=False,
+    image_cache_dir=None,
+    image_widths=default_image_widths,
+    site_url=None,
+    feed_size=default_feed_size,
+    section_indexes=False,
+    feed_author=None,
+    jobs=1,
+    compress=False,
+    link_report=None,
+):
+    # redo only the work the changed paths affect, updating manifest in place.
+    # a changed markdown file re-renders that page, any static change
+    # re-syncs static/ (which is only stats for the files that didn't
+    # change), and the dependency graph in the manifest says which pages used
+    # a changed template, partial or static file. then, as in build_site,
+    # recompresses what changed and rechecks the links
+    changed_pages = sorted(
+        path for path in changed
+        if is_under(path, content_dir) and os.path.basename(path) == "index.md"
+    )
+    # a template.html added to or removed from content/ changes which
+    # template the pages below it get
+    template_dirs = [
+        os.path.dirname(path) for path in changed
+        if is_under(path, content_dir) and os.path.basename(path) == directory_template_name
+    ]
+    static_changed = any(is_under(path, static_dir) for path in changed)
+
+    reasons = {}
+    deleted = 0
+    for from_path in changed_pages:
+        if os.path.exists(from_path):
+            reasons[from_path] = f"{from_path} changed"
+            continue
+        # the page was deleted, take its output with it
+        entry = manifest["pages"].pop(from_path, None)
+        deleted += entry is not None
+        if entry and os.path.exists(entry["output"]):
+            os.remove(entry["output"])
+            prune_empty_dirs(os.path.dirname(entry["output"]), dest_dir)
+
+    copied = 0
+    changed_images = set()
+    if static_changed:
+        old_static = {"pages": {}, "static": manifest["static"]}
+        manifest["static"], copied = sync_static(static_dir, dest_dir, static_ignore, link_mode)
+        remove_stale_outputs(
+            dest_dir, old_static, {"pages": manifest["pages"], "static": manifest["static"]}
+        )
+        if images:
+            old_images = manifest["images"]
+            manifest["images"], _ = process_images(
+                manifest["static"], dest_dir, old_images, image_cache_dir, image_widths, jobs, link_mode
+            )
+            old_derivatives = {"pages": {}, "static": {}, "images": old_images}
+            remove_stale_outputs(dest_dir, old_derivatives, manifest)
+            changed_images = changed_image_urls(old_images, manifest["images"])
+
+    changed_paths = {os.path.abspath(path) for path in changed}
+    for from_path, entry in manifest["pages"].items():
+        if from_path in reasons:
+            continue
+        for dep in entry.get("deps", {}):
+            if os.path.abspath(dep) in changed_paths:
+                reasons[from_path] = f"{dep} changed"
+                break
+        else:
+            if any(is_under(from_path, dir) for dir in template_dirs):
+                reasons[from_path] = "its directory template changed"
+            elif changed_images.intersection(entry.get("metadata", {}).get("images", ())):
+                reasons[from_path] = "image attributes changed"
+
+    chooser = TemplateChooser(content_dir, template_path)
+    fingerprints = Fingerprints(manifest["static"])
+    pages = []
+    for from_path in sorted(reasons):
+        if not os.path.exists(from_path):
+            continue
+        rel_dir = os.path.relpath(os.path.dirname(from_path), content_dir)
+        dest_path = os.path.normpath(os.path.join(dest_dir, rel_dir))
+        console.info(f"rebuilding {from_path}: {reasons[from_path]}")
+        manifest["pages"][from_path] = plan_page(from_path, dest_path, chooser, fingerprints)
+        pages.append((from_path, dest_path))
+    render_pages(pages, template_path, dest_dir, manifest, fingerprints, jobs, block_cache, page_cache)
+
+    if (pages or deleted) and (site_url is not None or section_indexes):
+        old_generated = {"pages": {}, "static": {}, "generated": manifest["generated"]}
+        manifest["generated"], _ = write_listings(
+            manifest, content_dir, template_path, dest_dir, site_url, feed_size, section_indexes, feed_author
+        )
+        remove_stale_outputs(dest_dir, old_generated, manifest)
+
+    if pages or deleted or static_changed:
+        if compress:
+            compress_outputs(dest_dir, manifest, manifest["compressed"], jobs)
+        if link_report is not None:
+            report_links(manifest, dest_dir, link_report)
+    return len(pages), copied
+
+def watch(
+    content_dir,
+    template_path,
+    static_dir,
+    dest_dir,
+    manifest_path,
+    static_ignore=default_static_ignore,
+    link_mode="copy",
+    interval=0.2,
+    debounce=0.1,
+    block_cache=None,
+    page_cache=None,
+    images=False,
+    image_widths=default_image_widths,
+    site_url=None,
+    feed_size=default_feed_size,
+    section_indexes=False,
+    feed_author=None,
+    jobs=1,
+    compress=False,
+    link_report=None,
+):
+    # one incremental build to get in sync, then stay warm and rebuild whatever
+    # changes until interrupted
+    manifest = build_site(
+        content_dir,
+        template_path,
+        static_dir,
+        dest_dir,
+        manifest_path,
+        incremental=True,
+        jobs=jobs,
+        static_ignore=static_ignore,
+        link_mode=link_mode,
+        block_cache=block_cache,
+        page_cache=page_cache,
+        images=images,
+        image_widths=image_widths,
+        site_url=site_url,
+        feed_size=feed_size,
+        section_indexes=section_indexes,
+        feed_author=feed_author,
+        compress=compress,
+        link_report=link_report,
+    )
+    image_cache_dir = os.path.join(os.path.dirname(manifest_path), "images")
+    paths = watch_paths(manifest, content_dir, static_dir, template_path)
+    snapshot = snapshot_tree(paths)
+    console.info(f"watching {', '.join(paths[:3])} and {len(paths) - 3} other templates for changes, ctrl-c to stop")
+    try:
+        while True:
+            changed, snapshot = wait_for_changes(paths, snapshot, interval, debounce)
+            start = time.perf_counter()
+            try:
+                rendered, copied = rebuild_changed(
+                    changed,
+                    manifest,
+                    content_dir,
+                    template_path,
+                    static_dir,
+                    dest_dir,
+                    static_ignore,
+                    link_mode,
+                    block_cache,
+                    page_cache,
+                    images,
+                    image_cache_dir,
+                    image_widths,
+                    site_url,
+                    feed_size,
+                    section_indexes,
+                    feed_author,
+                    jobs,
+                    compress,
+                    link_report,
+                )
+            except Exception as e:
+                # a half written markdown file shouldn't kill the watcher
+                console.warning(f"rebuild failed: {e}")
+                continue
+            save_manifest(manifest_path, manifest)
+            # pages may have picked up (or dropped) templates and partials
+            new_paths = watch_paths(manifest, content_dir, static_dir, template_path)
+            if new_paths != paths:
+                paths = new_paths
+                snapshot = snapshot_tree(paths)
+            elapsed = (time.perf_counter() - start) * 1000
+            console.info(f"rebuilt {rendered} pages, copied {copied} static files in {elapsed:.1f} ms")
+    except KeyboardInterrupt:
+        console.info("stopped watching")